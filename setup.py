@@ -10,6 +10,7 @@ if sys.version_info < (3, 6):
 # https://www.python.org/dev/peps/pep-0508/#environment-markers
 install_requires = (
     'appdirs',
+    'contextvars; python_version < "3.7"',  # backport
     'typeguard',
 )
 tests_require = ()  # ('pyflakes', 'readme_renderer'),
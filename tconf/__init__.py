@@ -2,19 +2,30 @@
     | tconf - TurtleConfig - It's turtles all the way down…
     | © 2020, Mike Miller - Released under the LGPL, version 3+.
 '''
+import json
 import logging
 import os
+import re
+import sys
 from argparse import ArgumentParser
 from ast import literal_eval
+from bisect import bisect_left
+from collections import OrderedDict
 from collections.abc import Sequence
+from contextvars import ContextVar
+from copy import copy, deepcopy
+from fnmatch import fnmatchcase
+from functools import partial
 from os.path import abspath, dirname, exists
-from types import ModuleType
+from threading import Event, Thread, local
+from time import monotonic
+from types import MappingProxyType, ModuleType
 from typing import get_type_hints, _GenericAlias, _SpecialForm
 
 from typeguard import check_type
 
 from . import adapters, meta
-from .adapters import file_adapter_map
+from .adapters import file_adapter_map, _MAX_CHAR, _timed
 
 
 log = logging.getLogger(__name__)
@@ -32,84 +43,207 @@ class TurtleConfig:
 
             app_name            A name for display and prefixes.
             sources             A sequence of configuration sources.
-                                May be path strings, os.environ, modules,
-                                class, and/or Adapter objects.
+                                May be path strings, urls, os.environ,
+                                modules, class, and/or Adapter objects.
+            cache_size          Maximum number of values to cache, the least
+                                recently used are evicted.  Unbounded if None.
+            cache_ttl           A dict of {AdapterClass: seconds}, values
+                                found in such sources expire after that time.
+            compact             Index file sources compactly and drop their
+                                parsed trees, to save memory.
             ensure_paths        Touches config files, if they don't exist.
+            frozen              Return read-only values, safe to share:
+                                tuples, frozensets, and read-only mappings.
             env_prefix          Set the environment prefix, defaults to "PY".
             ini_default_section The section to default to for .ini files.
             ini_interpolation   Whether to interpolate .ini files.
+            lazy                Parse sections of .json and .yaml files
+                                on first use, not at load.
+                                Not with merged or compact, which parse all.
+            merged              Resolve the precedence of sources up front,
+                                so most lookups are a single dict lookup.
+            profile             Time the phases of loading,
+                                see turtle_profile().
+            references          Substitute ${section.key} references in
+                                string values, with values from any source.
+            secrets_key         Path to a key file, to decrypt "enc:" values
+                                and .enc files on first use.
+            secrets_ttl         Seconds to keep decrypted secrets, if not
+                                forever.  They are then zeroed.
             vendor_name         Passes a vendor name for use in paths
                                 constructed by the appdirs module.
     '''
     _env_prefix = 'PY'
 
     def __init__(self, app_name, sources,
+                 cache_size=None,
+                 cache_ttl=None,
+                 compact=False,
                  ensure_paths=False,
                  env_prefix=None,
+                 frozen=False,
                  ini_default_section='main',
                  ini_interpolation=None,
+                 lazy=False,
+                 merged=False,
+                 profile=False,
+                 references=False,
+                 secrets_key=None,
+                 secrets_ttl=None,
                  vendor_name=None,
                 ):
         log.debug('🐢 TurtleConfig, version: %r', meta.version)
         if not isinstance(sources, Sequence):
             raise ValueError('A sequence of sources is required.')
+        if lazy and (merged or compact):
+            raise ValueError('lazy can not be combined with merged or compact,'
+                             ' which parse everything at load.')
 
+        self._profile = [] if profile else None
         self._app_name = app_name
+        self._compact = compact
+        self._frozen = frozen
         self._ini_default_section = ini_default_section
         self._ini_interpolation = ini_interpolation
+        self._key_index = None
+        self._lazy = lazy
+        self._merged = None  # key: (value, source, rank)
+        self._overlaid = False  # until an overlay is entered, skip checks
+        self._overlay_var = ContextVar('turtle_overlay', default=None)
+        self._proxies = {}  # section: _SectionProxy
+        self._dependents = {} if references else None  # key: {referrers}
+        self._dependents_version = object()  # replaced as they're added to
+        self._refresh_thread = None
+        self._secrets_key = secrets_key
+        self._secrets_ttl = secrets_ttl
+        self._secrets = (adapters._Secrets(secrets_key, secrets_ttl)
+                         if secrets_key else None)  # for enc: values
+        self._snapshots = {}  # source: {key: value}
+        self._subscriptions = []  # (pattern, callback)
         self._types_cache = {}
         self._values_cache = {}
+        self._wildcard_memo = {}  # key: type, bounded, of wildcard matches
+        if cache_size or cache_ttl:  # otherwise keep the plain dict fast path
+            self._values_cache = _TurtleCache(cache_size)
+        self._cache_ttl = cache_ttl or {}
         self._vendor_name = vendor_name
         if env_prefix:
             self._env_prefix = env_prefix
 
-        # wrap sources with Adapters
-        self._sources = []
-        for source in sources:
-            if isinstance(source, str):
-                source = self._handle_path(source, ensure_paths)
-            wrapped = self._adapt_source(source)
-            if wrapped is not None:
-                self._sources.append(wrapped)
-            log.debug('  source: %r', wrapped)
-
-        # find the defaults object, likely bringing up the rear:
-        for obj in reversed(self._sources):
-            if isinstance(obj, adapters.ObjectAdapter):
-                self._types_cache = { p[0]: p[2]  # dump value
-                                      for p in _list_object_props(obj._source) }
-                break  # -en Sie
-        else: # no break, aka not found
-            raise DefaultsMissingError(DefaultsMissingError.__doc__)
+        # a fresh report per config, or none, even after an error
+        adapters._profiling.report = self._profile
+        try:
+            # wrap sources with Adapters
+            self._sources = []
+            for source in sources:
+                if (isinstance(source, str)
+                        and not source.startswith(_URL_SCHEMES)):
+                    with _timed('path', source):
+                        source = self._handle_path(source, ensure_paths)
+                with _timed('adapt', _source_name(source)):
+                    wrapped = self._adapt_source(source)
+                if wrapped is not None:
+                    self._sources.append(wrapped)
+                log.debug('  source: %r', wrapped)
+            # generations of sources seen, shared ones may reload elsewhere
+            self._seen = { source: _generation(source)
+                           for source in self._sources }
+
+            # find the defaults object, likely bringing up the rear:
+            for obj in reversed(self._sources):
+                if isinstance(obj, adapters.ObjectAdapter):
+                    with _timed('schema', _source_name(obj._source)):
+                        self._types_cache = {
+                            p[0]: p[2]  # dump value
+                            for p in _list_object_props(obj._source)
+                        }
+                    break  # -en Sie
+            else: # no break, aka not found
+                raise DefaultsMissingError(DefaultsMissingError.__doc__)
+
+            # dynamic subtrees, e.g.: tenants.*.limits.rps
+            self._wildcard_types = [
+                (key.split('.'), type_)
+                for key, type_ in self._types_cache.items() if '*' in key
+            ]
+            # schema sections, answered with proxies, e.g.: cfg.main.foo
+            self._sections = set()
+            for key in self._types_cache:
+                while '.' in key:
+                    key = key.rpartition('.')[0]
+                    self._sections.add(key)
+            self._wildcard_sections = [
+                key.split('.') for key in self._sections if '*' in key
+            ]
+            if merged:
+                with _timed('merge', 'sources'):
+                    self._merge()
+        finally:
+            adapters._profiling.report = None
 
     def __getattr__(self, attr_name):
         ''' Attribute-style interface: cfg.foo.bar.baz.
 
             Only called when self.attr doesn't exist.
         '''
-        if attr_name in self._values_cache:
-            return self._values_cache[attr_name]
+        shadowed = False  # refers to an override, cached value won't do
+        if self._overlaid:  # scoped overrides, maybe
+            overlay = self._overlay_var.get()
+            if overlay is not None:
+                value = overlay._values_cache.get(attr_name, _MISSING)
+                if value is not _MISSING:
+                    _resolving.overridden = True  # for referrers, if any
+                    return value
+                if self._dependents is not None:
+                    shadowed = attr_name in overlay._referrers()
+        cache = self._values_cache  # once, may be swapped by a refresh
+        if not shadowed:
+            value = cache.get(attr_name, _MISSING)  # expires in one step
+            if value is not _MISSING:
+                return value
+        proxy = self._proxies.get(attr_name)
+        if proxy is None and self._is_section(attr_name):
+            proxy = self._proxies[attr_name] = _SectionProxy(self, attr_name)
+        if proxy is not None:
+            return proxy
+
         value = None
         log.debug('🐢.get(%r)', attr_name)
 
         # find value
-        for source in self._sources:  # find the value
-            value = getattr(source, attr_name)
-            if value is not None:
-                break  # found something
-        else:  # not broken, not found
-            raise AttributeError('%r not found.' % attr_name)
+        if self._merged is not None and '.' in attr_name:  # the short way
+            value, source = self._find_merged(attr_name)
+        if value is None:
+            for source in self._sources:  # find the value
+                value = getattr(source, attr_name)
+                if value is not None:
+                    break  # found something
+            else:  # not broken, not found
+                raise AttributeError('%r not found.' % attr_name)
 
         # fix attr_name if used with default section in ConfigParser
         # This is very complicated, would like to remove this:
         if ('.' not in attr_name
-            and isinstance(source, adapters.ConfigParserAdapter)
+            and isinstance(source, (adapters.ConfigParserAdapter,
+                                    adapters.CompactAdapter))
             and source._def_sect
-            and not isinstance(value, adapters._AttributeDict)):
+            and not isinstance(value, adapters._AttributeDict)
+            and not (isinstance(source, adapters.CompactAdapter)  # top-level?
+                     and source._get(attr_name) is not None)):
                 attr_name = source._def_sect + '.' + attr_name
 
+        cacheable = source._cacheable
+        if (self._dependents is not None and isinstance(value, str)
+            and '$' in value):
+            value, overridden = self._resolve_refs(attr_name, value)
+            if overridden:  # by an overlay, not for everyone
+                cacheable = False
+        if self._secrets and isinstance(value, str) and value[:4] == 'enc:':
+            value = self._secrets.decrypt(attr_name, value[4:])
+            cacheable = False  # kept by self._secrets instead
+
         # potentially convert then type check value
-        dest_type = self._types_cache.get(attr_name)
+        dest_type = self._get_type(attr_name)
         if isinstance(value, str) and dest_type is not str:
             # strings may or may not need type coercion
             value = self._coerce_string(attr_name, value, dest_type)
@@ -121,14 +255,28 @@ class TurtleConfig:
             # checks/converts whole section to support the attr iface :-/
             for key, val in value.items():  # every one !
                 key_name = attr_name + '.' + key
-                dest_type = self._types_cache.get(key_name)
+                dest_type = self._get_type(key_name)
+                if (self._dependents is not None and isinstance(val, str)
+                    and '$' in val):
+                    val, overridden = self._resolve_refs(key_name, val)
+                    value = adapters._AttributeDict(value, **{key: val})
+                    if overridden:
+                        cacheable = False
+                if (self._secrets and isinstance(val, str)
+                    and val[:4] == 'enc:'):
+                    val = self._secrets.decrypt(key_name, val[4:])
+                    value = adapters._AttributeDict(value, **{key: val})
+                    cacheable = False
                 if isinstance(val, str) and dest_type is not str:
                     value[key] = self._coerce_string(key_name, val, dest_type)
                 check_type(key_name, value[key], dest_type)
         else: # everything else
             check_type(attr_name, value, dest_type)
 
-        self._values_cache[attr_name] = value
+        if self._frozen:  # after checks, which may expect a list
+            value = _freeze(value)
+        if cacheable:
+            self._cache_value(cache, attr_name, value, source)
         return value
 
     def __getitem__(self, attr_path):
@@ -143,19 +291,41 @@ class TurtleConfig:
 
     def _adapt_source(self, source):
         ''' Wrap a source with an Adapter class. '''
-        if isinstance(source, adapters._Adapter):   # not again!
+        if isinstance(source, adapters._Adapter):   # not again!
             pass
+        elif isinstance(source, str) and source.startswith(_URL_SCHEMES):
+            source = adapters.HTTPAdapter(source,
+                interpolation=self._ini_interpolation,
+                default_section=self._ini_default_section,
+            )
         elif isinstance(source, str):               # a path
             pth = source
             source = None
-            if os.access(pth, os.R_OK):  # avoid non-existent | unreadable file
+            if os.path.isdir(pth) and os.access(pth, os.R_OK | os.X_OK):
+                source = adapters.DirectoryAdapter(pth,  # conf.d/
+                    interpolation=self._ini_interpolation,
+                    default_section=self._ini_default_section,
+                )
+            elif os.access(pth, os.R_OK):  # avoid non-existent | unreadable file
                 _, ext = os.path.splitext(pth)
                 AdapterClass = file_adapter_map.get(ext.casefold())
                 if AdapterClass:
-                    source = AdapterClass(pth,
+                    loader = partial(AdapterClass, pth,
                         interpolation=self._ini_interpolation,
                         default_section=self._ini_default_section,
+                        lazy=self._lazy,
+                        secrets_key=self._secrets_key,
+                        secrets_ttl=self._secrets_ttl,
                     )
+                    if issubclass(AdapterClass, adapters._FileAdapter):
+                        # parse each file once per process
+                        source = adapters._shared_adapter(pth,
+                            (AdapterClass, self._compact, self._lazy,
+                             self._ini_interpolation, self._ini_default_section),
+                            partial(self._load_file, loader),
+                        )
+                    else:
+                        source = loader()
             else:
                 log.warn('file %r unreadable, skipping.', pth)
 
@@ -174,6 +344,22 @@ class TurtleConfig:
 
         return source
 
+    def _cache_value(self, cache, attr_name, value, source):
+        ''' Store a value, with an expiration time if its source has one.
+
+            The cache is passed in, if a refresh has swapped it since the
+            value was found, the value is stored in the old one and dropped.
+        '''
+        if type(cache) is dict:
+            cache[attr_name] = value
+        else:
+            ttl = None
+            for cls in type(source).__mro__:  # subclasses inherit ttls
+                if cls in self._cache_ttl:
+                    ttl = self._cache_ttl[cls]
+                    break
+            cache.store(attr_name, value, ttl)
+
     def _coerce_string(self, attr_name, value, type_):
         ''' Convert a string value to the expected type. '''
         if isinstance(type_, dict):  # retrieve from argparse kwargs
@@ -186,8 +372,8 @@ class TurtleConfig:
             # compound types will need a harder look:
             elif (type_ in (list, dict, set, tuple) or
                   isinstance(type_, (_GenericAlias, _SpecialForm)) # __origin__
-                ):  # a safer, limited eval, raises (ValueError, SyntaxError)
-                converted = literal_eval(value)
+                ):  # raises (ValueError, SyntaxError)
+                converted = _decode_compound(value, type_)
 
             elif type_ is type(None):  # type_ is NoneType  :-/
                 if value is None or value.casefold() in ('null', 'none'):
@@ -201,37 +387,190 @@ class TurtleConfig:
 
         return value
 
+    def _resolve_refs(self, attr_name, value):
+        ''' Substitute ${dotted.key} references in a string with the values
+            of those keys, found through the whole cascade and cached.
+            Referrers are recorded, so a reload drops them as well.
+            Use $$ for a literal $.
+
+            Returns the value, and whether an overlay answered any of them,
+            directly or not, in which case it mustn't be cached.
+        '''
+        stack = getattr(_resolving, 'stack', None)
+        if stack is None:
+            stack = _resolving.stack = []
+        if attr_name in stack:
+            cycle = stack[stack.index(attr_name):] + [attr_name]
+            raise ValueError('reference cycle: ' + ' -> '.join(cycle))
+
+        def substitute(match):
+            ref = match.group(1)
+            if ref is None:  # escaped
+                return '$'
+            referrers = self._dependents.setdefault(ref, set())
+            if attr_name not in referrers:
+                referrers.add(attr_name)
+                self._dependents_version = object()  # for overlay memos
+            try:
+                return str(self[ref])
+            except KeyError:
+                raise ValueError('%r refers to %r, not found.'
+                                 % (attr_name, ref)) from None
+
+        outer = getattr(_resolving, 'overridden', False)
+        _resolving.overridden = False
+        stack.append(attr_name)
+        try:
+            value = _REFERENCE.sub(substitute, value)
+            overridden = _resolving.overridden
+        finally:
+            stack.pop()
+            _resolving.overridden = outer or _resolving.overridden  # up
+        return value, overridden
+
+    def _with_dependents(self, keys):
+        ''' Return a set of the keys and those referring to them,
+            directly or not.
+        '''
+        found = set(keys)
+        dependents = self._dependents
+        if dependents:
+            pending = list(found)
+            while pending:
+                for key in dependents.get(pending.pop(), ()):
+                    if key not in found:
+                        found.add(key)
+                        pending.append(key)
+        return found
+
+    def _load_file(self, loader):
+        source = loader()
+        if self._compact:  # index, then drop the parsed tree
+            source = adapters.CompactAdapter(source, loader)
+        return source
+
+    def _find_merged(self, attr_name):
+        ''' Find a value in the merged layers, returns (value, source),
+            or (None, None) when sources must be probed the long way.
+
+            Live sources, e.g. the environment, aren't merged as they may
+            change at any time, so those of higher rank are asked first.
+            As are those with values not to be cached, e.g. secrets.
+        '''
+        entry = self._merged.get(attr_name)
+        rank = entry[2] if entry else len(self._sources)
+        for i, source in enumerate(self._sources):
+            if i >= rank:
+                break
+            if source._live or not source._cacheable:
+                value = getattr(source, attr_name)
+                if value is not None:
+                    return value, source
+        if entry:
+            return entry[0], entry[1]
+        return None, None  # maybe a section, try the long way
+
+    def _merge(self, keys=None):
+        ''' Resolve which source wins for each key, all by default.
+
+            Snapshots of the sources' items are kept, to recompute only the
+            keys of a source that changed.
+        '''
+        layers = []
+        for rank, source in enumerate(self._sources):
+            if not source._live and source._cacheable:
+                items = self._snapshots.get(source)
+                if items is None:
+                    items = self._snapshots[source] = source._snapshot()
+                layers.append((rank, source, items))
+
+        if keys is None:
+            merged = {}
+            for rank, source, items in reversed(layers):  # first wins
+                for key, value in items.items():
+                    if value is not None:
+                        merged[key] = (value, source, rank)
+            self._merged = merged
+        else:
+            merged = self._merged
+            for key in keys:
+                for rank, source, items in layers:
+                    value = items.get(key)
+                    if value is not None:
+                        merged[key] = (value, source, rank)
+                        break
+                else:
+                    merged.pop(key, None)
+
+    def _is_section(self, attr_name):
+        ''' Whether the schema declares a section by this name. '''
+        if attr_name in self._sections:
+            return True
+        if self._wildcard_sections:
+            segments = attr_name.split('.')
+            return any(
+                len(pattern) == len(segments) and all(
+                    pat == '*' or pat == seg
+                    for pat, seg in zip(pattern, segments)
+                )
+                for pattern in self._wildcard_sections
+            )
+        return False
+
+    def _get_type(self, attr_name):
+        ''' Find the schema type of an option, trying wildcards if needed. '''
+        type_ = self._types_cache.get(attr_name)
+        if type_ is None and self._wildcard_types:
+            memo = self._wildcard_memo  # apart, keys may be unbounded
+            type_ = memo.get(attr_name)
+            if type_ is not None:
+                return type_
+            segments = attr_name.split('.')
+            for pattern, wild_type in self._wildcard_types:
+                if len(pattern) == len(segments) and all(
+                    pat == '*' or pat == seg
+                    for pat, seg in zip(pattern, segments)
+                ):
+                    if len(memo) >= _WILDCARD_MEMO_SIZE:
+                        memo.clear()  # start over, as with _DECODE_MEMO
+                    type_ = memo[attr_name] = wild_type
+                    break
+        return type_
+
     def _handle_path(self, path_str, ensure_paths=False):
         ''' Render an absolute path with folders from appdirs,
             and optionally ensure file exists.
+            A trailing slash denotes a folder, e.g.: conf.d/
         '''
         if path_str.startswith('{'):  # try to render template
-            from appdirs import site_config_dir, user_config_dir
+            with _timed('import', 'appdirs'):
+                from appdirs import site_config_dir, user_config_dir
             sd = site_config_dir(self._app_name, self._vendor_name)
             ud = user_config_dir(self._app_name, self._vendor_name)
             path_str = path_str.format(site_config_dir=sd, user_config_dir=ud)
 
         if ensure_paths:
-            folder_exists = None  # these are separate, to create relative file
-            folder = dirname(path_str)
-            log.debug('ensuring %r', folder)
-            # avoid attempt to create own folder:
-            if folder in ('', '.'):  # current dir
-                folder_exists = True
-            else:
-                try:
-                    os.makedirs(folder, exist_ok=True)
+            with _timed('ensure', path_str):
+                folder_exists = None  # separate, to create relative file
+                folder = dirname(path_str)
+                log.debug('ensuring %r', folder)
+                # avoid attempt to create own folder:
+                if folder in ('', '.'):  # current dir
                     folder_exists = True
-                except OSError as err:
-                    log.warn('unable to create path: %s', str(err))
+                else:
+                    try:
+                        os.makedirs(folder, exist_ok=True)
+                        folder_exists = True
+                    except OSError as err:
+                        log.warn('unable to create path: %s', str(err))
 
-            if folder_exists:
-                log.debug('ensuring %r', path_str)
-                try:
-                    if not exists(path_str):  # race
-                        open(path_str, 'a').close()  # do no harm
-                except OSError as err:
-                    log.warn('unable to create file: %s', str(err))
+                if folder_exists and not path_str.endswith(('/', os.sep)):
+                    log.debug('ensuring %r', path_str)
+                    try:
+                        if not exists(path_str):  # race
+                            open(path_str, 'a').close()  # do no harm
+                    except OSError as err:
+                        log.warn('unable to create file: %s', str(err))
 
         if not path_str.startswith('/'):  # relative?
             if len(path_str) > 2 and path_str[1] == ':':
@@ -244,11 +583,263 @@ class TurtleConfig:
         ''' After the fact. '''
         if not isinstance(source, adapters._Adapter):
             source = self._adapt_source(source)
-        self._sources = self._sources + (source,)
+        self._seen[source] = _generation(source)
+        self._sources = self._sources + [source]
+        self._key_index = None
+        if self._merged is not None:
+            self._merge()
 
     def clear_turtle_cache(self):
         ''' Use to update variables after a config update, or free memory. '''
         self._values_cache.clear()
+        self._key_index = None
+        if self._secrets:
+            self._secrets.clear()
+        for source in self._sources:
+            if isinstance(source, adapters.SecretsAdapter):
+                source._clear()
+
+    def reload_turtle_sources(self, sources=None):
+        ''' Re-read sources (all by default) and drop cached values of keys
+            that changed, returning the set of those keys.
+
+            Each source is compared with a snapshot of its previous data,
+            the cache is then replaced in one step.  Live sources without a
+            snapshot can't be compared the first time, so all is dropped,
+            as with shared files reloaded by another config beforehand.
+            New snapshots are kept only once the cache has been replaced,
+            so changes are found again if that fails.
+        '''
+        if sources is None:
+            sources = self._sources
+
+        changed = set()
+        unknown = False  # whether previous data is unknown
+        before = {}  # source: previous snapshot, of those changed
+        seen_now = {}  # source: generation, kept at the end
+        snapshots = {}  # source: items, kept at the end
+        for source in sources:
+            old = self._snapshots.get(source)
+            seen = self._seen.get(source)
+            if (old is None and not source._live  # take it before reloading
+                and seen == _generation(source)):
+                old = source._snapshot()
+            reloaded = source._reload()
+            generation = seen_now[source] = _generation(source)
+            if not reloaded and generation == seen:  # current data will do
+                snapshots[source] = source._snapshot() if old is None else old
+                continue
+            new = snapshots[source] = source._snapshot()
+            before[source] = old
+            if old is None:
+                unknown = True
+                changed.update(new)
+                continue
+            changed.update(_changed_keys(old, new))
+
+        if changed:
+            log.debug('🐢 reloaded, changed: %r', changed)
+            stale = self._with_dependents(changed)  # referrers too
+            for key in list(stale):  # sections containing them too
+                while '.' in key:
+                    key = key.rpartition('.')[0]
+                    stale.add(key)
+            cache = self._values_cache  # others may still be storing in it
+            if type(cache) is dict:
+                fresh = {} if unknown else {  # copied in one step, then
+                    key: value for key, value in dict(cache).items()
+                    if key not in stale
+                }
+            else:
+                fresh = cache.without(None if unknown else stale)
+        self._seen.update(seen_now)
+        self._snapshots.update(snapshots)
+        if changed:
+            if self._merged is not None:
+                self._merge(changed)
+            self._values_cache = fresh  # atomic swap
+            self._key_index = None
+            if self._subscriptions:
+                self._notify(changed, before)
+        return changed
+
+    def turtle_overlay(self, overrides):
+        ''' Return a view of this config with some options overridden,
+            e.g. per request: cfg.turtle_overlay({'main.jpeg_quality': 80})
+
+            Overrides may be dotted or nested by section, they are checked
+            now, everything else is shared with this config.  Use it in a
+            with statement to apply the overrides to this config itself,
+            within the current thread or async task.
+        '''
+        return _TurtleOverlay(self, overrides)
+
+    def subscribe_turtle(self, pattern, callback):
+        ''' Call callback(key, value) after a reload, when the value of an
+            option matching the pattern changes, e.g.: 'main.*'
+
+            Callbacks run in the thread doing the reload, which may be the
+            refresh thread.  A removed option's value is None.
+        '''
+        self._subscriptions.append((pattern, callback))
+
+    def unsubscribe_turtle(self, pattern, callback):
+        ''' Stop calling a callback subscribed with the same pattern. '''
+        self._subscriptions.remove((pattern, callback))
+
+    def _notify(self, changed, before):
+        ''' Call subscribers of keys whose resolved value has changed,
+            comparing the first value of each in the previous snapshots of
+            reloaded sources with the current ones.
+
+            Keys with a new value failing its checks are logged and skipped,
+            the reload has happened regardless.
+        '''
+        subscriptions = self._subscriptions
+        for key in sorted(changed):
+            callbacks = [ callback for pattern, callback in subscriptions
+                          if fnmatchcase(key, pattern) ]
+            if not callbacks:
+                continue
+            try:
+                old = self._resolve_raw(key, before)
+                new = self._resolve_raw(key)
+                if old is not _MISSING and old == new:  # shadowed, restored
+                    continue
+                value = self[key]
+            except KeyError:  # removed
+                value = None
+            except Exception as err:
+                log.error('changed option %r is invalid: %s', key, err)
+                continue
+            log.debug('🐢 notifying %s of %r', len(callbacks), key)
+            for callback in callbacks:
+                try:
+                    callback(key, value)
+                except Exception:  # others still want to know
+                    log.exception('subscriber %r of %r failed', callback, key)
+
+    def _resolve_raw(self, key, snapshots=None):
+        ''' Find the uncoerced value of a key, from snapshots when available,
+            preferring those given.  _MISSING when unknown or not found.
+        '''
+        for source in self._sources:
+            if snapshots and source in snapshots:
+                items = snapshots[source]
+                if items is None:  # previous data is unknown
+                    return _MISSING
+            else:
+                items = self._snapshots.get(source)
+            value = getattr(source, key) if items is None else items.get(key)
+            if value is not None:
+                return value
+        return _MISSING
+
+    def start_turtle_refresh(self, intervals):
+        ''' Re-poll sources periodically in a background thread,
+            so lookups never do the work themselves.
+
+            Arguments:
+                intervals:  a dict of {AdapterClass or adapter: seconds},
+                            e.g. {EnvAdapter: 5}
+        '''
+        schedule = {}
+        for source in self._sources:
+            interval = intervals.get(source)
+            if interval is None:
+                for cls in type(source).__mro__:  # subclasses inherit
+                    if cls in intervals:
+                        interval = intervals[cls]
+                        break
+            if interval:
+                schedule[source] = interval
+                self._snapshots[source] = source._snapshot()
+        if not schedule:
+            raise ValueError('No sources matched the given intervals.')
+
+        self.stop_turtle_refresh()
+        stop = Event()
+        thread = Thread(target=self._refresh_loop, args=(schedule, stop),
+                        name='TurtleRefresh', daemon=True)
+        self._refresh_thread = (thread, stop)
+        thread.start()
+
+    def stop_turtle_refresh(self):
+        ''' Stop a background refresh thread, if running. '''
+        if self._refresh_thread:
+            thread, stop = self._refresh_thread
+            self._refresh_thread = None
+            stop.set()
+            thread.join()
+
+    def _refresh_loop(self, schedule, stop):
+        due = { source: monotonic() + interval
+                for source, interval in schedule.items() }
+        while not stop.wait(max(0, min(due.values()) - monotonic())):
+            now = monotonic()
+            ready = [source for source, when in due.items() if when <= now]
+            try:
+                self.reload_turtle_sources(ready)
+            except Exception as err:  # keep going, data stays as it was
+                log.warning('refresh failed: %s', err)
+            for source in ready:
+                due[source] = now + schedule[source]
+
+    def turtle_cache_info(self):
+        ''' Return a dict of statistics about the values cache. '''
+        cache = self._values_cache
+        return dict(
+            size=len(cache),
+            maxsize=getattr(cache, 'maxsize', None),
+            evictions=getattr(cache, 'evictions', 0),
+            expirations=getattr(cache, 'expirations', 0),
+        )
+
+    def turtle_profile(self):
+        ''' Return a list of ProfileEntry(phase, target, seconds) tuples,
+            when constructed with profile=True, in order of start.
+
+            Phases are: path, import, ensure, adapt, read, parse, schema,
+            and merge.  Adapt includes those of its source nested within.
+        '''
+        return self._profile
+
+    def iter_turtle_prefix(self, prefix):
+        ''' Iterate over (key, value) pairs of options under a prefix,
+            e.g.: 'tenants.acme.'
+        '''
+        for key in self.turtle_keys(prefix):
+            yield key, self[key]
+
+    def turtle_key(self, name):
+        ''' Return a handle to look up one option in hot loops, e.g.:
+
+                quality = cfg.turtle_key('main.jpeg_quality')
+                quality()  # or quality.value
+
+            Calling it goes straight to the values cache, found anew each
+            time, so it stays current across reloads and clearing.
+            Raises KeyError when not found, as cfg[name] does.
+        '''
+        return _KeyHandle(self, name)
+
+    def turtle_keys(self, prefix=''):
+        ''' Return a sorted list of option keys found in all sources,
+            optionally limited to those under a prefix.
+        '''
+        index = self._key_index
+        if index is None:  # merge keys from every source, once
+            keys = set()
+            for source in self._sources:
+                keys.update(key for key, value in source._iter_items()
+                            if value is not None)  # None is not found
+            index = self._key_index = sorted(keys)
+
+        if not prefix:
+            return list(index)
+        start = bisect_left(index, prefix)
+        stop = bisect_left(index, prefix + _MAX_CHAR, start)
+        return index[start:stop]
 
 
 class TurtleArgumentParser(ArgumentParser):
@@ -257,21 +848,35 @@ class TurtleArgumentParser(ArgumentParser):
         Arguments:
             app_defaults    a (class, module, object) containing schema data.
             help_templ      a string such as: '🐢 {description} ({type_str})'
+            lazy            don't build options until help or an error needs
+                            them, scan the command-line directly instead.
+            known_only      ignore unrecognized arguments, to coexist with
+                            other command-line layers.
 
         Others arguments are passed to ArgumentParser.
     '''
-    def __init__(self, app_defaults, *args, help_templ=None, **kwargs):
+    def __init__(self, app_defaults, *args, help_templ=None, lazy=False,
+                 known_only=False, **kwargs):
 
         super().__init__(*args, **kwargs)
         if not help_templ:
             help_templ = '🐢 {description} ({type_str})'
+        self._turtle_help_templ = help_templ
+        self._turtle_known_only = known_only
+        self._turtle_built = False
+        self._turtle_opts = {}  # option string: (dest, params, …)
+        self._turtle_dests = {}  # dest: dotted key
 
         # look over default object and configure argument details:
-        for key, value, annotation in _list_object_props(app_defaults, mod_name=1):
+        for dotted, value, annotation in _list_object_props(app_defaults):
+            if '*' in dotted:
+                continue  # dynamic keys can't be options
 
+            key = dotted.replace('_', '-').replace('.', '-')  # argparse style
             log.debug('TurtleArgumentParser arg: %r', (key, value, annotation))
             params = {}
             if type(annotation) is dict:
+                annotation = dict(annotation)  # don't clobber the schema
                 description = annotation.pop('desc', '')
                 type_ = annotation.pop('type', value.__class__)
                 params = annotation  # pass rest to parser.add_argument()
@@ -289,22 +894,556 @@ class TurtleArgumentParser(ArgumentParser):
                 params['metavar'] = type_str[0].upper()
                 params['type'] = type_
 
-            if type(annotation) is dict and 'choices' in annotation:
-                type_str += ': ' + str(annotation['choices'])[1:-1]
+            if 'choices' in params:
+                type_str += ': ' + str(params['choices'])[1:-1]
+
+            # only plain options may be handled by the scanner
+            simple = (set(params) <= _SIMPLE_ARG_PARAMS and
+                      params.get('action', 'store') in _SIMPLE_ARG_ACTIONS)
+            option = (self.prefix_chars[0]*2) + key
+            dest = key.replace('-', '_')
+            self._turtle_opts[option] = (
+                dest, params, type_str, description, simple
+            )
+            self._turtle_dests[dest] = dotted
+
+        if not lazy:
+            self._build_turtle_args()
 
+    def _build_turtle_args(self):
+        ''' Add the schema options to the parser, formatting help as we go. '''
+        if self._turtle_built:
+            return
+        self._turtle_built = True
+
+        for option, (_, params, type_str, desc, _) in self._turtle_opts.items():
+            params = dict(params)
             # specific help value overrides
             if 'help' not in params:
-                params['help'] = help_templ.format(
-                    description=description,
+                params['help'] = self._turtle_help_templ.format(
+                    description=desc,
                     type_str=type_str,
                 )
             # build argument
             self.add_argument(
-                (self.prefix_chars[0]*2) + key,
+                option,
                 default=None, # don't want to stop here, continue with None
                 **params,
             )
 
+    def _scan_turtle_args(self, args):
+        ''' Fast path: look up each argument directly in the option table.
+
+            Returns a dict, or None when the full parser is needed to handle
+            help, errors, abbreviations, or arguments added by others.
+        '''
+        if not all(action.option_strings for action in self._actions):
+            return None  # positionals were added
+
+        values = {}
+        opts = self._turtle_opts
+        prefix_chars = self.prefix_chars
+        args = iter(args)
+        for arg in args:
+            option, eq, text = arg.partition('=')
+            spec = opts.get(option)
+            if spec is None:
+                if option in self._option_string_actions:
+                    return None  # help or someone else's option
+                if self._turtle_known_only:
+                    if arg == '--':
+                        break
+                    if (self.allow_abbrev and arg[:1] in prefix_chars and
+                        any(opt.startswith(option) for opt in opts)):
+                        return None  # possible abbreviation, ask argparse
+                    continue  # not ours, leave it alone
+                return None
+
+            dest, params, _, _, simple = spec
+            if not simple:
+                return None
+            action = params.get('action')
+            if action:  # store_true/false
+                if eq:
+                    return None
+                values[dest] = (action == 'store_true')
+                continue
+
+            if not eq:
+                text = next(args, None)
+                if text is None or text[:1] in prefix_chars:
+                    return None
+            try:
+                value = params['type'](text)
+            except (TypeError, ValueError):
+                return None
+            if 'choices' in params and value not in params['choices']:
+                return None
+            values[dest] = value
+
+        log.debug('TurtleArgumentParser scanned: %r', values)
+        return values
+
+    def format_help(self):
+        self._build_turtle_args()
+        return super().format_help()
+
+    def format_usage(self):
+        self._build_turtle_args()
+        return super().format_usage()
+
+    def parse_known_args(self, args=None, namespace=None):
+        self._build_turtle_args()
+        return super().parse_known_args(args, namespace)
+
+    def parse_turtle_args(self, args=None):
+        ''' Parse the command-line, returning a dict of {dest: value}.
+
+            In lazy mode the arguments are scanned directly and the full
+            parser is built only when needed, e.g. for --help or errors.
+        '''
+        if args is None:
+            args = sys.argv[1:]
+
+        if not self._turtle_built:
+            values = self._scan_turtle_args(args)
+            if values is not None:
+                return values
+
+        if self._turtle_known_only:
+            namespace, _ = self.parse_known_args(args)
+        else:
+            namespace = self.parse_args(args)
+        return vars(namespace)
+
+
+class MappedArray:
+    ''' Annotates an option holding a large numeric array in a binary file,
+        its value being the path, e.g.:
+
+            WEIGHTS = MappedArray('<f4', (None, 256))
+            …
+            weights: WEIGHTS = 'weights.npy'
+
+        Named outside the annotation, as linters take strings within it for
+        forward references.
+
+        The file is memory-mapped read-only, not copied, then returned as a
+        NumPy array when available, otherwise a memoryview.  Only the dtype
+        and shape are checked, not each element.
+
+        Arguments:
+            dtype       in NumPy style, e.g.: '<f4', 'f8', 'u1'
+            shape       a tuple of dimensions, None where they may vary.
+                        Files without a .npy header are read as raw
+                        data, where only one dimension may vary.
+    '''
+    __slots__ = ('dtype', 'shape')
+    _formats = {  # struct formats for memoryview
+        'f4': 'f', 'f8': 'd',
+        'i1': 'b', 'i2': 'h', 'i4': 'i', 'i8': 'q',
+        'u1': 'B', 'u2': 'H', 'u4': 'I', 'u8': 'Q',
+    }
+
+    def __init__(self, dtype, shape=None):
+        self.dtype = self._normalize(dtype)
+        self.shape = None if shape is None else tuple(shape)
+
+    def __call__(self, path):
+        ''' Map the file at path, checking its dtype and shape. '''
+        import mmap  # defer to avoid loading when not needed
+        with open(path, 'rb') as infile:  # mapping stays open
+            mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapped[:6] == b'\x93NUMPY':
+            dtype, shape, fortran, offset = _read_npy_header(mapped, path)
+            dtype = self._normalize(dtype)
+            if dtype != self.dtype:
+                raise TypeError('%s: dtype %r, expected %r'
+                                % (path, dtype, self.dtype))
+        else:  # raw
+            dtype, shape, fortran, offset = self.dtype, self.shape, False, 0
+            if shape is None:
+                shape = (None,)
+            if shape.count(None) > 1:
+                raise ValueError('%s: raw data needs a shape' % path)
+            if None in shape:  # infer it
+                known = 1
+                for dim in shape:
+                    known *= dim or 1
+                shape = tuple(
+                    len(mapped) // (known * int(dtype[2:]))
+                    if dim is None else dim for dim in shape
+                )
+
+        if self.shape is not None and (len(shape) != len(self.shape) or any(
+            want is not None and want != got
+            for want, got in zip(self.shape, shape)
+        )):
+            raise TypeError('%s: shape %r, expected %r'
+                            % (path, shape, self.shape))
+        count = 1
+        for dim in shape:
+            count *= dim
+        size = count * int(dtype[2:])
+        if offset + size > len(mapped):
+            raise ValueError('%s: truncated, %s bytes short'
+                             % (path, offset + size - len(mapped)))
+
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        if numpy:  # read-only, as is the map
+            array = numpy.frombuffer(mapped, dtype=dtype, count=count,
+                                     offset=offset)
+            return array.reshape(shape, order='F' if fortran else 'C')
+
+        if fortran or dtype[0] not in ('|', _NATIVE_ORDER):
+            raise ValueError('%s: byte or Fortran order requires NumPy' % path)
+        return memoryview(mapped)[offset:offset + size].cast(
+            self._formats[dtype[1:]], shape
+        )
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__, self.dtype, self.shape)
+
+    @classmethod
+    def _normalize(cls, dtype):
+        ''' Return a dtype with explicit byte order, e.g.: f4 --> <f4 '''
+        order, code = (dtype[0], dtype[1:]) if dtype[0] in '<>=|' else (
+                      '=', dtype)
+        if code not in cls._formats:
+            raise ValueError('dtype %r not supported.' % dtype)
+        if code.endswith('1'):
+            order = '|'
+        elif order in ('=', '|'):
+            order = _NATIVE_ORDER
+        return order + code
+
+
+class _TurtleOverlay:
+    ''' A view of a TurtleConfig with a few options overridden.
+
+        Only the overrides are held, lookups of others fall through to the
+        parent config, its sources and warm cache.
+    '''
+    __slots__ = ('_parent', '_proxies', '_referrers_memo', '_values_cache')
+    _overlaid = False  # not scoped itself
+
+    def __init__(self, parent, overrides):
+        self._parent = parent
+        self._proxies = {}
+        self._referrers_memo = (None, None)  # (dependents version, keys)
+        self._values_cache = values = {}  # overrides, answered first
+        pending = list(overrides.items())
+        while pending:
+            key, value = pending.pop()
+            if isinstance(value, dict) and parent._is_section(key):
+                pending.extend( (key + '.' + name, val)
+                                for name, val in value.items() )
+                continue
+            dest_type = parent._get_type(key)
+            if isinstance(value, str) and dest_type is not str:
+                value = parent._coerce_string(key, value, dest_type)
+            check_type(key, value, dest_type)
+            values[key] = _freeze(value) if parent._frozen else value
+
+    def __getattr__(self, attr_name):
+        values = self._values_cache
+        if attr_name in values:
+            return values[attr_name]
+        parent = self._parent
+        if parent._is_section(attr_name):
+            proxy = self._proxies.get(attr_name)
+            if proxy is None:
+                proxy = self._proxies[attr_name] = _SectionProxy(self,
+                                                                 attr_name)
+            return proxy
+        if parent._dependents is not None:  # references see overrides
+            with self:
+                return getattr(parent, attr_name)
+        return getattr(parent, attr_name)
+
+    def __getitem__(self, attr_path):
+        try:
+            return self.__getattr__(attr_path)
+        except AttributeError as err:
+            raise KeyError(str(err)) from err
+
+    def __enter__(self):
+        ''' Tokens are kept per context, not here, as one overlay may be
+            entered by several tasks at once.
+        '''
+        parent = self._parent
+        parent._overlaid = True  # for good, once set
+        token = parent._overlay_var.set(self)
+        _overlay_tokens.set(_overlay_tokens.get() + (token,))
+        return self
+
+    def __exit__(self, *exc_info):
+        tokens = _overlay_tokens.get()
+        _overlay_tokens.set(tokens[:-1])
+        self._parent._overlay_var.reset(tokens[-1])
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self._values_cache)
+
+    def _referrers(self):
+        ''' Keys known to refer to overrides here, directly or not,
+            whose values cached by the parent won't do.  Found again only
+            once more references are known.
+        '''
+        parent = self._parent
+        version, found = self._referrers_memo
+        if version is not parent._dependents_version:
+            version = parent._dependents_version  # before, to miss none
+            found = parent._with_dependents(self._values_cache)
+            self._referrers_memo = (version, found)
+        return found
+
+    def turtle_overlay(self, overrides):
+        ''' Return a view with these overrides added to those here. '''
+        child = _TurtleOverlay(self._parent, overrides)
+        child._values_cache = dict(self._values_cache, **child._values_cache)
+        return child
+
+
+class _KeyHandle:
+    ''' A lookup of one option, skipping the generic attribute machinery
+        while its value is cached.  See TurtleConfig.turtle_key().
+    '''
+    __slots__ = ('_cfg', 'name')
+
+    def __init__(self, cfg, name):
+        self._cfg = cfg
+        self.name = name
+
+    def __call__(self):
+        cfg = self._cfg
+        if not cfg._overlaid:  # the short way, unless scoped
+            value = cfg._values_cache.get(self.name, _MISSING)
+            if value is not _MISSING:
+                return value
+        return cfg[self.name]
+
+    value = property(__call__)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.name)
+
+
+class _SectionProxy:
+    ''' Stands in for a schema section in the attribute interface,
+        so that cfg.main.jpeg_quality goes through the whole cascade.
+
+        One per section is kept by TurtleConfig, missing options are None.
+        Also a read-only mapping, e.g. dict(cfg.main), of the options and
+        subsections found in all sources.  Options named like its methods
+        are found with cfg.main['keys'].
+    '''
+    __slots__ = ('_cfg', '_prefix')
+
+    def __init__(self, cfg, section):
+        self._cfg = cfg
+        self._prefix = section + '.'
+
+    def __getattr__(self, attr_name):
+        if attr_name.startswith('__'):  # copy, pickle, etc.
+            raise AttributeError(attr_name)
+        key = self._prefix + attr_name
+        cfg = self._cfg
+        if not cfg._overlaid:  # the short way, unless scoped
+            value = cfg._values_cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        try:
+            return cfg.__getattr__(key)
+        except AttributeError:
+            return None
+
+    def __contains__(self, attr_name):
+        return attr_name in self.keys()
+
+    def __getitem__(self, attr_name):
+        return self._cfg[self._prefix + attr_name]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self._prefix[:-1])
+
+    def items(self):
+        return [ (name, self[name]) for name in self.keys() ]
+
+    def keys(self):
+        ''' Names of options and subsections under the section, sorted. '''
+        start = len(self._prefix)
+        names = []
+        for key in self._cfg.turtle_keys(self._prefix):  # contiguous
+            name = key[start:].partition('.')[0]
+            if not names or names[-1] != name:
+                names.append(name)
+        return names
+
+
+class _TurtleCache(OrderedDict):
+    ''' A values cache with optional LRU eviction and per-key expiration.
+
+        Used only when limits are set, otherwise a plain dict is faster.
+    '''
+    def __init__(self, maxsize=None):
+        super().__init__()
+        self.maxsize = maxsize
+        self.evictions = 0
+        self.expirations = 0
+        self._expires = {}  # key: deadline, only for those that expire
+
+    def __contains__(self, key):
+        if not super().__contains__(key):
+            return False
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= monotonic():
+            del self[key]
+            self.expirations += 1
+            return False
+        return True
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._expires.pop(key, None)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:  # or expired
+            raise KeyError(key)
+        return value
+
+    def clear(self):
+        super().clear()
+        self._expires.clear()
+
+    def get(self, key, default=None):
+        ''' Return a value unless missing or expired, checked in one step,
+            so it can't expire between a test and a read.
+        '''
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            return default
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= monotonic():
+            if self.pop(key, _MISSING) is not _MISSING:  # not by another
+                self._expires.pop(key, None)
+                self.expirations += 1
+            return default
+        try:
+            self.move_to_end(key)
+        except KeyError:  # removed by another thread meanwhile
+            pass
+        return value
+
+    def without(self, keys):
+        ''' Return a copy of the cache, minus the given keys, or all of them
+            when None.
+        '''
+        fresh = self.__class__(self.maxsize)
+        fresh.evictions, fresh.expirations = self.evictions, self.expirations
+        if keys is None:
+            return fresh
+        items = list(self.items())  # in one step, others may be storing
+        expires = self._expires.copy()
+        for key, value in items:
+            if key not in keys:
+                fresh[key] = value
+                if key in expires:
+                    fresh._expires[key] = expires[key]
+        return fresh
+
+    def store(self, key, value, ttl=None):
+        ''' Add a value, expiring after ttl seconds if given. '''
+        self[key] = value
+        self.move_to_end(key)
+        if ttl is None:
+            self._expires.pop(key, None)
+        else:
+            self._expires[key] = monotonic() + ttl
+
+        if self.maxsize and len(self) > self.maxsize:
+            old_key, _ = self.popitem(last=False)
+            self._expires.pop(old_key, None)
+            self.evictions += 1
+
+
+_DECODE_MEMO = {}  # (raw string, type): (decoded, copier)
+_DECODE_MEMO_SIZE = 512
+_DELIMITED_TYPES = {
+    bool: lambda item: item.casefold() in ('true', '1'),
+    float: float,
+    int: int,
+    str: str,
+}
+_MISSING = object()
+_NATIVE_ORDER = '<' if sys.byteorder == 'little' else '>'
+_overlay_tokens = ContextVar('turtle_overlay_tokens', default=())  # stack
+_REFERENCE = re.compile(r'\$(?:\{([\w.-]+)\}|\$)')  # ${main.foo} or $$
+_resolving = local()  # .stack of keys being resolved, to catch cycles,
+                      # .overridden whether an overlay answered meanwhile
+_URL_SCHEMES = ('http://', 'https://')
+_WILDCARD_MEMO_SIZE = 1024
+_SIMPLE_ARG_ACTIONS = ('store', 'store_true', 'store_false')
+_SIMPLE_ARG_PARAMS = {'action', 'choices', 'help', 'metavar', 'type'}
+
+
+def _changed_keys(old, new):
+    ''' Return the keys whose values differ in two snapshots of a source. '''
+    if type(old) is type(new) is adapters._LazySnapshot:  # by section
+        return old.changed(new)
+    return {
+        key for key in old.keys() | new.keys()
+        if old.get(key, _MISSING) != new.get(key, _MISSING)
+    }
+
+
+def _freeze(value):
+    ''' Make a read-only copy of a compound value, recursively. '''
+    if isinstance(value, adapters._AttributeDict):  # sections
+        if type(value) is adapters._FrozenAttributeDict:
+            return value
+        return adapters._FrozenAttributeDict(
+            (key, _freeze(val)) for key, val in value.items()
+        )
+    if isinstance(value, dict):
+        return MappingProxyType({ key: _freeze(val)
+                                  for key, val in value.items() })
+    if isinstance(value, list) or type(value) is tuple:  # not namedtuples
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+
+
+def _generation(source):
+    ''' Returns what changes when a file source is reloaded, otherwise None.
+    '''
+    if isinstance(source, (adapters._FileAdapter, adapters.CompactAdapter)):
+        return source._stat
+
+
+def _source_name(source):
+    ''' A short name for a source, for reports. '''
+    if isinstance(source, str):
+        return source
+    if source is os.environ:
+        return 'os.environ'
+    return getattr(source, '__name__', type(source).__name__)
+
 
 def _list_object_props(container, prefix='', mod_name=False):
     ''' Inspect object property annotations and types, return a list.
@@ -332,8 +1471,11 @@ def _list_object_props(container, prefix='', mod_name=False):
         else:
             arg_name = prefix + key
 
-        if isinstance(value, type):  # class, follow container
-            arg_list.extend(_list_object_props(value, prefix=arg_name))
+        if isinstance(value, type):  # class, follow container
+            if getattr(value, '_wildcard', False):  # stands in for any name
+                arg_name = prefix + '*'
+            arg_list.extend(_list_object_props(value, prefix=arg_name,
+                                               mod_name=mod_name))
         else:
             if annotation:
                 arg_list.append( (arg_name, value, annotation) )
@@ -341,3 +1483,103 @@ def _list_object_props(container, prefix='', mod_name=False):
                 arg_list.append( (arg_name, value, type(value)) )
 
     return arg_list
+
+
+def _decode_compound(value, type_):
+    ''' Decode a string into a compound value, e.g. a list or dict.
+
+        JSON is tried first for brackets and braces, then a comma-delimited
+        list if the element type is simple, e.g. List[int] from "1,2,3",
+        with literal_eval as the safer, limited fallback.
+        Results are memoized, mutable ones are returned as copies,
+        shallow unless nested.
+    '''
+    try:
+        key = (value, type_)
+        decoded, copier = _DECODE_MEMO.get(key, (_MISSING, None))
+    except TypeError:  # unhashable annotation
+        key, decoded = None, _MISSING
+
+    if decoded is _MISSING:
+        origin = getattr(type_, '__origin__', type_)
+        stripped = value.strip()
+        if stripped[:1] in ('[', '{'):
+            try:
+                decoded = json.loads(stripped)
+                if origin in (tuple, set, frozenset) and type(decoded) is list:
+                    decoded = origin(decoded)
+            except ValueError:  # not JSON, maybe a Python literal
+                pass
+        elif stripped[:1] not in ('(', '"', "'"):
+            decoded = _decode_delimited(stripped, origin,
+                                        getattr(type_, '__args__', None))
+        if decoded is _MISSING:
+            decoded = literal_eval(value)
+
+        copier = _copier(decoded)
+        if key is not None:
+            if len(_DECODE_MEMO) >= _DECODE_MEMO_SIZE:
+                _DECODE_MEMO.clear()  # start over, cheaper than tracking use
+            _DECODE_MEMO[key] = (decoded, copier)
+
+    return decoded if copier is None else copier(decoded)
+
+
+def _copier(value):
+    ''' How to hand out a shared decoded value: None when immutable all
+        the way down, copy when only its top level is mutable, otherwise
+        deepcopy, e.g. for a list of lists or a tuple of lists.
+    '''
+    if isinstance(value, (list, dict, set)):
+        items = value.values() if isinstance(value, dict) else value
+        if all(_copier(item) is None for item in items):
+            return copy
+        return deepcopy
+    if isinstance(value, (tuple, frozenset)):
+        if all(_copier(item) is None for item in value):
+            return None
+        return deepcopy
+    return None  # scalars
+
+
+def _decode_delimited(value, origin, args):
+    ''' Split a comma-delimited string into a list, tuple, or set,
+        converting items by the element annotation.
+        Returns _MISSING when not applicable.
+    '''
+    if origin not in (list, tuple, set, frozenset) or not args:
+        return _MISSING
+    items = [ item.strip() for item in value.split(',') ] if value else []
+
+    if origin is tuple and args[-1] is not Ellipsis:  # Tuple[int, str]
+        if len(args) != len(items):
+            return _MISSING
+        converters = [ _DELIMITED_TYPES.get(arg) for arg in args ]
+    else:
+        converters = [_DELIMITED_TYPES.get(args[0])] * len(items)
+    if None in converters:  # not simple, e.g. Union[str, int]
+        return _MISSING
+
+    try:
+        return origin(conv(item) for conv, item in zip(converters, items))
+    except ValueError:
+        return _MISSING
+
+
+def _read_npy_header(mapped, path):
+    ''' Parse the header of a .npy file,
+        returns a tuple of (dtype, shape, fortran_order, data offset).
+    '''
+    major = mapped[6]
+    if major == 1:
+        start, length = 10, int.from_bytes(mapped[8:10], 'little')
+    elif major in (2, 3):
+        start, length = 12, int.from_bytes(mapped[8:12], 'little')
+    else:
+        raise ValueError('%s: .npy version %s not supported.' % (path, major))
+    header = literal_eval(mapped[start:start + length].decode('latin1'))
+    if not isinstance(header.get('descr'), str):  # e.g. structured
+        raise ValueError('%s: dtype %r not supported.'
+                         % (path, header.get('descr')))
+    return (header['descr'], tuple(header['shape']), header['fortran_order'],
+            start + length)
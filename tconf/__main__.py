@@ -0,0 +1,206 @@
+'''
+    | tconf - TurtleConfig command-line tools
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Usage: python3 -m tconf {command} …
+'''
+import logging
+import sys
+from argparse import ArgumentParser
+
+from . import meta
+
+
+log = logging.getLogger(__name__)
+
+
+def do_encrypt(args):
+    ''' Encrypt a value or file for secrets_key, making the key if needed. '''
+    import os
+    from cryptography.fernet import Fernet
+
+    key_path = os.path.expanduser(args.key_path)
+    if not os.path.exists(key_path):
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as outfile:
+            outfile.write(Fernet.generate_key())
+        log.warning('new key written to %r, keep it safe.', key_path)
+    with open(key_path, 'rb') as infile:
+        fernet = Fernet(infile.read().strip())
+
+    if args.file:
+        with open(args.value, 'rb') as infile:
+            token = fernet.encrypt(infile.read())
+        out_path = args.value + '.enc'
+        with open(out_path, 'wb') as outfile:
+            outfile.write(token)
+        print(f'written to {out_path!r}.')
+    else:
+        value = args.value
+        if value == '-':
+            value = sys.stdin.read().rstrip('\n')
+        print('enc:' + fernet.encrypt(value.encode()).decode())
+
+
+def _import_defaults(spec):
+    ''' Import a module of defaults, or a class within: module:ClassName. '''
+    from importlib import import_module
+
+    mod_name, _, attr = spec.partition(':')
+    defaults = import_module(mod_name)
+    if attr:
+        defaults = getattr(defaults, attr)
+    return defaults
+
+
+def _sources(args, defaults):
+    import os
+
+    sources = [os.environ] if args.env else []
+    sources.extend(args.sources)
+    sources.append(defaults)
+    return sources
+
+
+def do_profile(args):
+    ''' Load a configuration and report where the time went. '''
+    from time import perf_counter
+    from . import TurtleConfig
+
+    start = perf_counter()
+    defaults = _import_defaults(args.defaults)
+    imported = perf_counter()
+
+    cfg = TurtleConfig(args.app_name, _sources(args, defaults),
+        compact=args.compact,
+        ensure_paths=args.ensure_paths,
+        merged=args.merged,
+        profile=True,
+    )
+    end = perf_counter()
+
+    mod_name = args.defaults.partition(':')[0]
+    print(f'{(imported - start) * 1000:10.3f} ms  {"import":7} {mod_name}')
+    for entry in cfg.turtle_profile():
+        indent = '  ' if entry.phase in ('import', 'read', 'parse') else ''
+        print(f'{entry.seconds * 1000:10.3f} ms  {indent}{entry.phase:7} '
+              f'{entry.target}')
+    print(f'{(end - start) * 1000:10.3f} ms  total')
+
+
+def do_serve(args):
+    ''' Serve a configuration to local processes, until interrupted. '''
+    import os
+    import signal
+    from . import TurtleConfig
+    from .daemon import TurtleServer
+
+    cfg = TurtleConfig(args.app_name,
+        _sources(args, _import_defaults(args.defaults)),
+        merged=args.merged,
+    )
+    socket_path = args.socket
+    if not socket_path:  # not in /tmp, where others could get there first
+        runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+        if not runtime_dir:
+            raise ValueError('XDG_RUNTIME_DIR is not set, '
+                             'pass --socket in a private folder.')
+        socket_path = os.path.join(runtime_dir, f'tconf-{args.app_name}.sock')
+    server = TurtleServer(cfg, socket_path, interval=args.interval)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit())  # clean up
+    print(f'serving {args.app_name!r} on {socket_path!r}, ctrl-c to stop.')
+    try:
+        server.serve_turtle()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def do_sqlite_import(args):
+    ''' Bulk import a config file into an SQLite database. '''
+    from .adapters import sqlite_import
+    count = sqlite_import(args.file_path, args.db_path)
+    print(f'{count} options written to {args.db_path!r}.')
+
+
+def setup():
+    parser = ArgumentParser(prog=meta.pkgname, description=__doc__.strip())
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='show debug logging.')
+    parser.add_argument('--version', action='version', version=meta.version)
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    cmd = subparsers.add_parser('encrypt',
+        help='encrypt a value, or a file to file.enc, for secrets_key.',
+    )
+    cmd.add_argument('key_path', help='key file, created if needed.')
+    cmd.add_argument('value', help='the value, - to read from stdin.')
+    cmd.add_argument('-f', '--file', action='store_true',
+                     help='value is the path of a file to encrypt.')
+    cmd.set_defaults(func=do_encrypt)
+
+    cmd = subparsers.add_parser('profile',
+        help='time the loading of a configuration, phase by phase.',
+    )
+    cmd.add_argument('app_name', help='name of the app, for paths and env.')
+    cmd.add_argument('defaults',
+        help='importable module of defaults, optionally module:ClassName.',
+    )
+    cmd.add_argument('sources', nargs='*', help='paths or urls to load.')
+    cmd.add_argument('-c', '--compact', action='store_true',
+                     help='index file sources compactly.')
+    cmd.add_argument('-e', '--env', action='store_true',
+                     help='include the environment, first.')
+    cmd.add_argument('-m', '--merged', action='store_true',
+                     help='merge sources at load.')
+    cmd.add_argument('--ensure-paths', action='store_true',
+                     help="touch config files, if they don't exist.")
+    cmd.set_defaults(func=do_profile)
+
+    cmd = subparsers.add_parser('serve',
+        help='serve resolved values to local processes, over a Unix socket.',
+    )
+    cmd.add_argument('app_name', help='name of the app, for paths and env.')
+    cmd.add_argument('defaults',
+        help='importable module of defaults, optionally module:ClassName.',
+    )
+    cmd.add_argument('sources', nargs='*', help='paths or urls to load.')
+    cmd.add_argument('-e', '--env', action='store_true',
+                     help='include the environment, first.')
+    cmd.add_argument('-i', '--interval', type=float, default=1,
+                     help='seconds between refreshes of sources, 0 for none.')
+    cmd.add_argument('-m', '--merged', action='store_true',
+                     help='merge sources at load.')
+    cmd.add_argument('-s', '--socket',
+        help='path to listen on, default: $XDG_RUNTIME_DIR/tconf-{app}.sock',
+    )
+    cmd.set_defaults(func=do_serve)
+
+    cmd = subparsers.add_parser('sqlite-import',
+        help='bulk import a config file into a database for SQLiteAdapter.',
+    )
+    cmd.add_argument('file_path', help='file to import, .ini, .json, etc.')
+    cmd.add_argument('db_path', help='database to write, created if needed.')
+    cmd.set_defaults(func=do_sqlite_import)
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format='  %(levelname)-7s %(name)s: %(message)s',
+    )
+    return args
+
+
+def main():
+    args = setup()
+    try:
+        args.func(args)
+    except (ImportError, OSError, ValueError) as err:
+        log.error(err)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,52 +6,229 @@
 '''
 import os
 import logging
+import socket
+import sys
+from bisect import bisect_left
+from collections import namedtuple
+from importlib import import_module
+from operator import itemgetter
+from threading import Lock, Thread, Timer, local
+from time import monotonic, perf_counter
+from weakref import WeakValueDictionary
 
 
 log = logging.getLogger(__name__)
+_MAX_CHAR = chr(0x10FFFF)  # sorts after anything else in a key
+_MISSING = object()
+_profiling = local()  # .report is a list while a profiled config loads
+_registry = WeakValueDictionary()  # (path, options): adapter, shared
+
+ProfileEntry = namedtuple('ProfileEntry', 'phase target seconds')
 
 
 class _AttributeDict(dict):
     ''' Access dict items through attributes '''
+    __slots__ = ()
+
     def __getattr__(self, attr):
         return self.get(attr)
 
     __getitem__ = __getattr__
 
 
+class _FrozenAttributeDict(_AttributeDict):
+    ''' A read-only _AttributeDict, safe to share. '''
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('%s is read-only' % self.__class__.__name__)
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):  # copy and pickle without __setitem__
+        return self.__class__, (dict(self),)
+
+
 class _Adapter:
     ''' Abstract Base. '''
+    __slots__ = ('_source', '__weakref__')
+    _cacheable = True  # whether found values may be cached by the config
+    _live = False  # read live, data may change without a reload
+
     def __repr__(self):
         return f'{self.__class__.__name__}({self._source!r})'
 
+    def _iter_items(self):
+        ''' Iterate over (dotted.key, value) pairs of all leaf options.
+            Sources unable to enumerate their options yield nothing.
+        '''
+        return iter(())
+
+    def _reload(self):
+        ''' Re-read the source, returning True if it may have changed. '''
+        return False
+
+    def _snapshot(self):
+        ''' A {dotted.key: value} mapping of the current data, to compare
+            with after a reload.
+        '''
+        return dict(self._iter_items())
+
+
+class _FileAdapter(_Adapter):
+    ''' Abstract Base for file sources, which are reloaded when changed.
+
+        Subclasses may be given the text of a document directly,
+        e.g. when fetched from elsewhere.
+    '''
+    __slots__ = ('_stat',)
+    _modules = ()  # imported on first parse, timed when profiling
+
+    def _open(self, file_path, text=None):
+        self._source = file_path
+        if getattr(_profiling, 'report', None) is not None:
+            for name in self._modules:
+                if name not in sys.modules:
+                    with _timed('import', name):
+                        import_module(name)
+        if text is None:
+            self._stat = _stat_signature(file_path)
+            self._load()
+        else:  # not a file, won't be reloaded
+            self._stat = None
+            self._parse(text)
+
+    def _load(self):
+        ''' Read and parse the file at self._source. '''
+        with _timed('read', self._source):
+            with open(self._source) as f:
+                text = f.read()
+        with _timed('parse', self._source):
+            self._parse(text)
+
+    def _parse(self, text):
+        ''' Parse the text of a document. '''
+        raise NotImplementedError
+
+    def _reload(self):
+        stat = _stat_signature(self._source)
+        if stat is None or stat == self._stat:  # gone or unchanged
+            return False
+        log.debug('%s reloading %r', self.__class__.__name__, self._source)
+        self._stat = stat
+        self._load()
+        return True
+
 
 class ArgParserAdapter(_Adapter):
     ''' Wraps a TurtleArgumentParser. '''
+    __slots__ = ('_dests',)
+
     def __init__(self, source):
-        # parse just once, use Namespace afterward
-        self._source = source.parse_args()
+        # parse just once, use a dict of values afterward
+        self._source = source.parse_turtle_args()
+        self._dests = source._turtle_dests
 
     def __getattr__(self, attr_name, **kwargs):
         flattened_name = attr_name.replace('.', '_')
         log.debug('%s.get(%r)', self.__class__.__name__, flattened_name)
-        return getattr(self._source, flattened_name, None)
+        return self._source.get(flattened_name)
 
     def __repr__(self):
         return f'{self.__class__.__name__}( {self._source!r} )'
 
+    def _iter_items(self):
+        for dest, value in self._source.items():
+            if value is not None and dest in self._dests:
+                yield self._dests[dest], value
+
 
-class ConfigParserAdapter(_Adapter):
+class CompactAdapter(_Adapter):
+    ''' Indexes the options of another adapter into a compact form,
+        so the original and its parsed tree may be dropped.
+
+        Keys are sorted, values are held in a parallel list,
+        found by bisection.  Sections are rebuilt on demand.
+    '''
+    __slots__ = ('_def_sect', '_loader', '_stat', '_table')
+
+    def __init__(self, adapter, loader=None):
+        ''' Arguments:
+                adapter     the adapter to index.
+                loader      optional callable returning a fresh adapter,
+                            enables reloading.
+        '''
+        self._def_sect = (adapter._def_sect
+                          if isinstance(adapter, ConfigParserAdapter) else None)
+        self._loader = loader
+        self._source = adapter._source
+        self._stat = (adapter._stat
+                      if isinstance(adapter, _FileAdapter) else None)
+        self._index(adapter._iter_items())
+
+    def __getattr__(self, attr_name):
+        log.debug('%s.get(%r)', self.__class__.__name__, attr_name)
+        value = self._get(attr_name)
+        if value is None and self._def_sect and '.' not in attr_name:
+            log.debug('  falling back to [%s]%s', self._def_sect, attr_name)
+            value = self._get(self._def_sect + '.' + attr_name)
+        return value
+
+    def _get(self, key):
+        keys, values = self._table
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return values[i]
+
+        # a section?  find the range of keys under it
+        prefix = key + '.'
+        start = bisect_left(keys, prefix, i)
+        stop = bisect_left(keys, prefix + _MAX_CHAR, start)
+        if start == stop:
+            return None
+
+        return _nest(zip(keys[start:stop], values[start:stop]), len(prefix))
+
+    def _index(self, items):
+        items = sorted(items, key=itemgetter(0))
+        self._table = (  # swap both at once
+            [key for key, _ in items], [value for _, value in items]
+        )
+
+    def _iter_items(self):
+        return zip(*self._table)
+
+    def _reload(self):
+        if self._loader is None:
+            return False
+        stat = _stat_signature(self._source)
+        if stat is None or stat == self._stat:
+            return False
+        self._stat = stat
+        self._index(self._loader()._iter_items())
+        return True
+
+
+class ConfigParserAdapter(_FileAdapter):
     ''' Loads values from .ini format files via ConfigParser.
         Note: this supports only one or two levels of hierarchy.
     '''
-    def __init__(self, file_path, interpolation=False,
-                 default_section=None, **kwargs):
+    __slots__ = ('_copa', '_def_sect', '_interpolation')
+    _modules = ('configparser',)
+
+    def __init__(self, file_path, interpolation=None,
+                 default_section=None, text=None, **kwargs):
+        self._def_sect = default_section
+        self._interpolation = interpolation
+        self._open(file_path, text)
+
+    def _parse(self, text):
         # defer to avoid loading when not needed:
         from configparser import ConfigParser
-        self._copa = ConfigParser(interpolation=interpolation)
-        self._copa.read(file_path)
-        self._def_sect = default_section
-        self._source = file_path
+        copa = ConfigParser(interpolation=self._interpolation)
+        copa.read_string(text, source=self._source)
+        self._copa = copa
 
     def __getattr__(self, attr_name):
         log.debug('%s.get(%r)', self.__class__.__name__, attr_name)
@@ -78,6 +255,221 @@ class ConfigParserAdapter(_Adapter):
 
         return value
 
+    def _iter_items(self):
+        for section in self._copa.sections():
+            for name, value in self._copa.items(section):
+                yield section + '.' + name, value
+
+
+class DaemonAdapter(_Adapter):
+    ''' Reads resolved values from a local daemon over its Unix socket,
+        started with: python3 -m tconf serve …
+
+        Values are kept in a read-through cache here, until the daemon
+        pushes word that they've changed, so the config doesn't cache them.
+        A daemon run by another user is refused.
+        While the daemon can't be reached nothing is found, nor cached, and
+        it's retried once a second at most.  Lower sources are found
+        instead, cached by the config until clear_turtle_cache().
+
+        Arguments:
+            socket_path     where the daemon listens.
+            timeout         seconds to wait on the daemon.
+    '''
+    __slots__ = ('_cache', '_conn', '_generation', '_lock', '_retry_at',
+                 '_timeout', '_watcher')
+    _cacheable = False
+
+    def __init__(self, socket_path, timeout=1):
+        self._source = socket_path
+        self._cache = {}
+        self._conn = self._watcher = None
+        self._generation = 0  # bumped by invalidations
+        self._lock = Lock()
+        self._retry_at = 0
+        self._timeout = timeout
+
+    def __getattr__(self, attr_name):
+        cache = self._cache
+        if attr_name in cache:
+            return cache[attr_name]
+        if attr_name.startswith('__'):  # copy, pickle, etc.
+            raise AttributeError(attr_name)
+        log.debug('%s.get(%r)', self.__class__.__name__, attr_name)
+        from .daemon import _recv, _send
+
+        with self._lock:
+            generation = self._generation
+            try:
+                conn = self._connect()
+                if conn is None:
+                    return None
+                _send(conn, ('get', attr_name))
+                reply = _recv(conn)
+                if reply is None:
+                    raise ConnectionResetError('closed by the daemon')
+            except (OSError, ValueError, EOFError) as err:
+                log.warning('daemon %r unavailable: %s', self._source, err)
+                self._disconnect()
+                return None
+
+            if reply[0] == 'error':
+                raise ValueError(reply[2])
+            value = _attribute_dicts(reply[2]) if reply[0] == 'value' else None
+            if self._watcher and generation == self._generation:
+                cache[attr_name] = value  # None too, until invalidated
+        return value
+
+    def _close(self):
+        ''' Disconnect from the daemon, it's reconnected when needed. '''
+        with self._lock:
+            self._disconnect()
+            self._retry_at = 0
+
+    def _connect(self):
+        ''' Return the connection, making both if needed and not too soon.
+            The lock must be held.
+        '''
+        if self._conn is None:
+            if monotonic() < self._retry_at:
+                return None
+            self._retry_at = monotonic() + 1
+            from .daemon import _recv, _send
+            conn = watcher = None
+            try:
+                conn = self._open()
+                watcher = self._open()
+                _send(watcher, ('watch',))
+                if _recv(watcher) != ('watching',):
+                    raise ConnectionError('unexpected reply from daemon')
+            except BaseException:
+                for sock in (conn, watcher):
+                    if sock:
+                        sock.close()
+                raise
+            watcher.settimeout(None)  # waits for pushes
+            self._conn, self._watcher = conn, watcher
+            Thread(target=self._watch, args=(watcher,), daemon=True,
+                   name='TurtleDaemonWatch').start()
+        return self._conn
+
+    def _disconnect(self):
+        ''' Close both connections, the lock must be held. '''
+        conn, watcher = self._conn, self._watcher
+        self._conn = self._watcher = None
+        self._generation += 1
+        self._cache.clear()
+        if conn:
+            conn.close()
+        if watcher:
+            try:
+                watcher.shutdown(socket.SHUT_RDWR)  # wakes the thread
+            except OSError:
+                pass
+
+    def _open(self):
+        from .daemon import _check_owner
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self._source)
+            _check_owner(sock, self._source)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _watch(self, watcher):
+        ''' Drop cached values as the daemon pushes changed keys. '''
+        from .daemon import _recv
+        try:
+            while True:
+                message = _recv(watcher)
+                if message is None:
+                    break
+                if message[0] == 'invalidate':
+                    with self._lock:
+                        self._generation += 1
+                        self._invalidate(message[1])
+        except (OSError, ValueError, EOFError) as err:
+            log.debug('daemon watch ended: %s', err)
+        finally:
+            with self._lock:  # changes would go unnoticed, stop caching
+                if self._watcher is watcher:
+                    self._disconnect()
+            watcher.close()
+
+    def _invalidate(self, keys):
+        ''' Drop keys, with the sections containing them and vice versa. '''
+        cache = self._cache
+        for key in keys:
+            cache.pop(key, None)
+            parent = key
+            while '.' in parent:
+                parent = parent.rpartition('.')[0]
+                cache.pop(parent, None)
+            prefix = key + '.'
+            for name in [name for name in cache if name.startswith(prefix)]:
+                del cache[name]
+
+
+class DirectoryAdapter(CompactAdapter):
+    ''' Loads the fragments of a folder such as conf.d/ into one layer.
+
+        Files with extensions in file_adapter_map are read in lexical order,
+        later ones override earlier, e.g. 20-local.ini beats 10-base.json.
+        A rescan re-parses only fragments that changed on disk.
+    '''
+    __slots__ = ('_fragments', '_kwargs')
+
+    def __init__(self, dir_path, **kwargs):
+        self._def_sect = kwargs.get('default_section')
+        self._fragments = {}  # name: (stat signature, items)
+        self._kwargs = kwargs  # passed to fragment adapters
+        self._loader = self._stat = None
+        self._source = dir_path
+        self._table = ([], [])
+        self._scan()
+
+    def _reload(self):
+        return self._scan()
+
+    def _scan(self):
+        ''' Read new or changed fragments, returning True if any were. '''
+        old = self._fragments
+        fragments = {}
+        with os.scandir(self._source) as entries:
+            for entry in entries:
+                _, ext = os.path.splitext(entry.name)
+                AdapterClass = file_adapter_map.get(ext.casefold())
+                if (not AdapterClass or not issubclass(AdapterClass, _FileAdapter)
+                    or not entry.is_file()):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+                if entry.name in old and old[entry.name][0] == signature:
+                    fragments[entry.name] = old[entry.name]
+                    continue
+
+                log.debug('%s loading %r', self.__class__.__name__, entry.path)
+                try:
+                    adapter = AdapterClass(entry.path, **self._kwargs)
+                except Exception as err:  # keep going, like unreadable files
+                    log.warning('unable to load %r: %s', entry.path, err)
+                    if entry.name in old:  # keep the last good one
+                        fragments[entry.name] = old[entry.name]
+                    continue
+                fragments[entry.name] = (signature, list(adapter._iter_items()))
+
+        if fragments == old:
+            return False
+        merged = {}
+        for name in sorted(fragments):  # later override earlier
+            merged.update(fragments[name][1])
+        self._fragments = fragments
+        self._index(merged.items())
+        return True
+
 
 class EnvAdapter(_Adapter):
     ''' Finds values set in the system environment.
@@ -85,6 +477,9 @@ class EnvAdapter(_Adapter):
         Limitation: Can't find hierarchical values unless used with dict
                     notation.
     '''
+    __slots__ = ('_key', '_prefix')
+    _live = True
+
     def __init__(self, prefix, env=os.environ, **kwargs):
         self._prefix = prefix
         self._source = env
@@ -106,14 +501,163 @@ class EnvAdapter(_Adapter):
     def __repr__(self):
         return f'{self.__class__.__name__}(os.environ)'
 
+    def _iter_items(self):
+        prefix = self._prefix + '.'
+        start = len(prefix)
+        for key, value in self._source.items():
+            if isinstance(key, str) and key.startswith(prefix):
+                yield key[start:].lower(), value
+
+    def _reload(self):
+        return True  # may change at any time
+
+
+class HTTPAdapter(_Adapter):
+    ''' Loads a JSON, YAML, XML, or .ini document from a URL.
+
+        The document is fetched at creation and on reload, never during
+        lookups.  One keep-alive connection is reused, and refreshes are
+        conditional, so an unchanged document costs a 304 and no parsing.
+
+        Arguments:
+            url         http(s) address of the document.
+            cache_path  file to keep the last-known-good copy in,
+                        loaded when the server can't be reached.
+            format      extension to parse with, e.g. '.json'.
+                        Found from the url or Content-Type if not given.
+            timeout     seconds to wait on the server.
+    '''
+    __slots__ = ('_cache_path', '_conn', '_etag', '_format', '_inner',
+                 '_kwargs', '_modified', '_timeout')
+    _content_types = {
+        'application/json': '.json',
+        'application/x-yaml': '.yaml',
+        'application/xml': '.xml',
+        'application/yaml': '.yaml',
+        'text/xml': '.xml',
+        'text/yaml': '.yaml',
+    }
+
+    def __init__(self, url, cache_path=None, format=None, timeout=5,
+                 **kwargs):
+        self._cache_path = cache_path
+        self._conn = self._etag = self._inner = self._modified = None
+        self._format = format
+        self._kwargs = kwargs  # passed to the parsing adapter
+        self._source = url
+        self._timeout = timeout
+
+        try:
+            self._fetch()
+        except Exception as err:
+            log.warning('unable to fetch %r: %s', url, err)
+            if cache_path and os.access(cache_path, os.R_OK):
+                log.warning('  using last-known-good copy: %r', cache_path)
+                with open(cache_path) as f:
+                    self._inner = self._make_adapter(f.read())
+
+    def __getattr__(self, attr_name):
+        log.debug('%s.get(%r)', self.__class__.__name__, attr_name)
+        inner = self._inner
+        return None if inner is None else getattr(inner, attr_name)
+
+    def _fetch(self):
+        ''' Request the document, returns True if it was new. '''
+        from http.client import HTTPConnection, HTTPSConnection, HTTPException
+        from urllib.parse import urlsplit
+        parts = urlsplit(self._source)
+        target = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._modified:
+            headers['If-Modified-Since'] = self._modified
+
+        for attempt in (1, 2):  # the kept-alive connection may have closed
+            if self._conn is None:
+                Connection = (HTTPSConnection if parts.scheme == 'https'
+                              else HTTPConnection)
+                self._conn = Connection(parts.netloc, timeout=self._timeout)
+            try:
+                self._conn.request('GET', target, headers=headers)
+                response = self._conn.getresponse()
+                body = response.read()  # must finish, to reuse connection
+                break
+            except (HTTPException, OSError):
+                self._conn.close()
+                self._conn = None
+                if attempt == 2:
+                    raise
+
+        if response.status == 304:
+            log.debug('  not modified: %r', self._source)
+            return False
+        if response.status != 200:
+            raise OSError(f'HTTP {response.status} {response.reason}')
+
+        if not self._format:
+            content_type = response.getheader('Content-Type', '')
+            self._format = self._content_types.get(
+                content_type.partition(';')[0].strip()
+            )
+        charset = response.headers.get_content_charset() or 'utf8'
+        text = body.decode(charset)
+        self._inner = self._make_adapter(text)  # parse before committing
+        self._etag = response.getheader('ETag')
+        self._modified = response.getheader('Last-Modified')
+
+        if self._cache_path:  # keep the last-known-good
+            temp_path = self._cache_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                f.write(text)
+            os.replace(temp_path, self._cache_path)
+        return True
+
+    def _iter_items(self):
+        inner = self._inner
+        return iter(()) if inner is None else inner._iter_items()
+
+    def _make_adapter(self, text):
+        ext = self._format
+        if not ext:
+            from urllib.parse import urlsplit
+            _, ext = os.path.splitext(urlsplit(self._source).path)
+        AdapterClass = file_adapter_map.get((ext or '').casefold())
+        if AdapterClass is None:
+            raise ValueError(f'unknown format for {self._source!r}')
+        return AdapterClass(self._source, text=text, **self._kwargs)
+
+    def _reload(self):
+        try:
+            return self._fetch()
+        except Exception as err:  # keep what we have
+            log.warning('unable to fetch %r: %s', self._source, err)
+            return False
 
-class JSONAdapter(_Adapter):
-    ''' Loads values from JSON format files. '''
-    def __init__(self, file_path, **kwargs):
-        from json import load  # defer to avoid loading when not needed
-        with open(file_path) as f:
-            self._data = load(f, object_hook=_AttributeDict)
-        self._source = file_path
+
+class JSONAdapter(_FileAdapter):
+    ''' Loads values from JSON format files.
+
+        When lazy, top-level sections are found in one scan of the text,
+        then parsed on first use.
+    '''
+    __slots__ = ('_data', '_lazy')
+    _modules = ('json',)
+
+    def __init__(self, file_path, text=None, lazy=False, **kwargs):
+        self._lazy = lazy
+        self._open(file_path, text)
+
+    def _parse(self, text):
+        from json import loads  # defer to avoid loading when not needed
+        if self._lazy:
+            index = _index_json(text)
+            if index is not None:
+                self._data = _LazySections(text, index,
+                    lambda key, chunk: loads(chunk, object_hook=_AttributeDict)
+                )
+                return
+        self._data = loads(text, object_hook=_AttributeDict)
 
     def __getattr__(self, attr_name):
         log.debug('%s.get(%r)', self.__class__.__name__, attr_name)
@@ -127,9 +671,19 @@ class JSONAdapter(_Adapter):
 
         return value
 
+    def _iter_items(self):
+        return _flatten(self._data)
+
+    def _snapshot(self):
+        if isinstance(self._data, _LazySections):
+            return _LazySnapshot(self._data, lambda value: value)
+        return dict(self._iter_items())
+
 
 class ObjectAdapter(_Adapter):
     ''' Load values from objects. '''
+    __slots__ = ()
+
     def __init__(self, source):
         self._source = source
 
@@ -155,15 +709,198 @@ class ObjectAdapter(_Adapter):
     def __repr__(self):
         return f'{self.__class__.__name__}({self._source.__name__})'
 
+    def _iter_items(self):
+        from . import _list_object_props  # circular
+        for key, value, _ in _list_object_props(self._source):
+            if '*' not in key:  # wildcards aren't real options
+                yield key, value
+
+
+class SecretsAdapter(_Adapter):
+    ''' Loads options from a whole encrypted file, e.g. secrets.json.enc,
+        in the format of its inner extension.
+
+        It's decrypted with a local key file when an option is first
+        accessed, not at load.  Plaintext is kept in a bytearray, zeroed
+        after secrets_ttl seconds, then decrypted again when needed.
+        The options parsed from it are kept until then too, and dropped,
+        though as strings they can't be zeroed.  Values aren't cached by
+        the config, nor listed.
+    '''
+    __slots__ = ('_adapter', '_expires', '_kwargs', '_secrets', '_stat',
+                 '_token')
+    _cacheable = False
+
+    def __init__(self, file_path, secrets_key=None, secrets_ttl=None,
+                 **kwargs):
+        if not secrets_key:
+            raise ValueError(f'{file_path!r}: a secrets_key file is needed.')
+        self._source = file_path
+        self._kwargs = kwargs  # passed to the inner adapter
+        self._secrets = _Secrets(secrets_key, secrets_ttl)
+        self._adapter = self._expires = self._token = None
+        self._stat = _stat_signature(file_path)
 
-class SYAMLAdapter(_Adapter):
-    ''' Loads values from YAML format files. '''
-    def __init__(self, file_path, **kwargs):
+    def __getattr__(self, attr_name):
+        log.debug('%s.get(%r)', self.__class__.__name__, attr_name)
+        if self._token is None:  # first use
+            with open(self._source, 'rb') as infile:
+                self._token = infile.read().strip()
+
+        expires = self._expires
+        if expires is not None and expires <= monotonic():  # timer's late
+            self._expire()
+
+        adapter = self._adapter
+        if adapter is None:  # first use, or after ttl
+            base, _ = os.path.splitext(self._source)
+            _, ext = os.path.splitext(base)
+            AdapterClass = file_adapter_map.get(ext.casefold())
+            if AdapterClass is None or AdapterClass is SecretsAdapter:
+                raise ValueError(f'unknown format for {self._source!r}')
+            text = self._secrets.decrypt(self._source, self._token,
+                                         self._expire)
+            adapter = AdapterClass(self._source, text=text, **self._kwargs)
+            ttl = self._secrets._ttl
+            self._expires = None if ttl is None else monotonic() + ttl
+            self._adapter = adapter
+        return getattr(adapter, attr_name)
+
+    def _clear(self):
+        ''' Zero the plaintext and drop what was parsed from it. '''
+        self._secrets.clear()
+        self._adapter = self._expires = None
+
+    def _expire(self):
+        ''' Drop what was parsed from the plaintext, once that's zeroed.
+            One from before a reload may drop a newer one early, which is
+            simply parsed again.
+        '''
+        self._adapter = self._expires = None
+
+    def _reload(self):
+        stat = _stat_signature(self._source)
+        if stat is None or stat == self._stat:  # gone or unchanged
+            return False
+        self._stat = stat
+        self._secrets.clear()
+        self._adapter = self._expires = self._token = None
+        return True
+
+
+class SQLiteAdapter(_Adapter):
+    ''' Finds values in an SQLite database of dotted keys, for very large
+        configurations.  Only the keys requested are fetched.
+
+        Values are stored as JSON text, see sqlite_import() to create one.
+
+        Arguments:
+            file_path   the database.
+            cache_size  number of recent lookups to keep.
+            mmap_size   bytes of the database to memory-map, if given.
+            read_only   open the database read-only.
+    '''
+    __slots__ = ('_cache', '_cache_size', '_conn', '_version')
+    _live = True
+    _create_sql = ('CREATE TABLE IF NOT EXISTS tconf '
+                   '(key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID')
+    _insert_sql = 'INSERT OR REPLACE INTO tconf (key, value) VALUES (?, ?)'
+    # constant statements are prepared once and cached by the sqlite3 module
+    _select_sql = 'SELECT value FROM tconf WHERE key = ?'
+    _section_sql = 'SELECT key, value FROM tconf WHERE key >= ? AND key < ?'
+    _all_sql = 'SELECT key, value FROM tconf ORDER BY key'
+
+    def __init__(self, file_path, cache_size=256, mmap_size=None,
+                 read_only=True, **kwargs):
+        import sqlite3  # defer to avoid loading when not needed
+        from collections import OrderedDict
+        from urllib.request import pathname2url
+        target = file_path
+        if read_only:
+            target = 'file:%s?mode=ro' % pathname2url(os.path.abspath(file_path))
+        # autocommit, to never hold a transaction open:
+        self._conn = sqlite3.connect(target, check_same_thread=False,
+                                     isolation_level=None, uri=read_only)
+        if mmap_size:
+            self._conn.execute('PRAGMA mmap_size = %d' % int(mmap_size))
+
+        self._cache = OrderedDict()  # read-through, lru
+        self._cache_size = cache_size
+        self._source = file_path
+        self._version = self._data_version()
+
+    def __getattr__(self, attr_name):
+        log.debug('%s.get(%r)', self.__class__.__name__, attr_name)
+        cache = self._cache
+        value = cache.get(attr_name, _MISSING)  # one step, shared by threads
+        if value is not _MISSING:
+            try:
+                cache.move_to_end(attr_name)
+            except KeyError:  # evicted meanwhile, the value still stands
+                pass
+            return value
+
+        from json import loads
+        row = self._conn.execute(self._select_sql, (attr_name,)).fetchone()
+        if row:
+            value = loads(row[0])
+        else:  # a section?
+            prefix = attr_name + '.'
+            rows = self._conn.execute(
+                self._section_sql, (prefix, prefix + _MAX_CHAR)
+            ).fetchall()
+            value = _nest(((key, loads(val)) for key, val in rows),
+                          len(prefix)) if rows else None
+
+        cache[attr_name] = value
+        if len(cache) > self._cache_size:
+            try:
+                cache.popitem(last=False)
+            except KeyError:  # emptied by another thread
+                pass
+        return value
+
+    def _data_version(self):
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _iter_items(self):
+        from json import loads
+        for key, value in self._conn.execute(self._all_sql):
+            yield key, loads(value)
+
+    def _reload(self):
+        version = self._data_version()  # changes on commits by others
+        if version == self._version:
+            return False
+        self._version = version
+        self._cache.clear()
+        return True
+
+
+class SYAMLAdapter(_FileAdapter):
+    ''' Loads values from YAML format files.
+
+        When lazy, top-level sections are found by their unindented keys,
+        then parsed on first use.
+    '''
+    __slots__ = ('_data', '_lazy', '_yaml_type')
+    _modules = ('strictyaml',)
+
+    def __init__(self, file_path, text=None, lazy=False, **kwargs):
+        self._lazy = lazy
+        self._open(file_path, text)
+
+    def _parse(self, text):
         import strictyaml  # defer to avoid loading when not needed
-        with open(file_path) as f:
-            self._data = strictyaml.load(f.read())
         self._yaml_type = strictyaml.YAML
-        self._source = file_path
+        if self._lazy:
+            index = _index_yaml(text)
+            if index is not None:
+                self._data = _LazySections(text, index,
+                    lambda key, chunk: strictyaml.load(chunk).get(key)
+                )
+                return
+        self._data = strictyaml.load(text)
 
     def __getattr__(self, attr_name):
         value = self._data  # start here
@@ -183,23 +920,39 @@ class SYAMLAdapter(_Adapter):
 
         return value
 
+    def _iter_items(self):
+        if isinstance(self._data, _LazySections):
+            return _flatten({ key: value.data
+                              for key, value in self._data.items() })
+        return _flatten(self._data.data)
+
+    def _snapshot(self):
+        if isinstance(self._data, _LazySections):
+            return _LazySnapshot(self._data, lambda value: value.data)
+        return dict(self._iter_items())
 
-class XMLAdapter(_Adapter):
+
+class XMLAdapter(_FileAdapter):
     ''' Loads values from XML format files and directs access.
 
         Note: skips root element to provide parity with other source types.
     '''
-    def __init__(self, file_path, attr_prefix='_', **kwargs):
+    __slots__ = ('_attr_prefix', '_data')
+    _modules = ('xmltodict',)
+
+    def __init__(self, file_path, attr_prefix='_', text=None, **kwargs):
+        self._attr_prefix = attr_prefix
+        self._open(file_path, text)
+
+    def _parse(self, text):
         import xmltodict  # defer to avoid loading when not needed
-        with open(file_path) as f:
-            data = xmltodict.parse(
-                f.read(), xml_attribs=True, attr_prefix=attr_prefix,
-                disable_entities=False,
-            )
+        data = xmltodict.parse(
+            text, xml_attribs=True, attr_prefix=self._attr_prefix,
+            disable_entities=False,
+        )
         if len(data) == 1:  # skip root
             data = tuple(data.values())[0]
         self._data = data
-        self._source = file_path
 
     def __getattr__(self, attr_name):
         from collections import OrderedDict
@@ -215,10 +968,375 @@ class XMLAdapter(_Adapter):
                 # needs to crawl for more OrderedDicts
         return value
 
+    def _iter_items(self):
+        return _flatten(self._data)
+
+
+def _nest(items, offset=0):
+    ''' Build nested sections from (dotted.key, value) pairs,
+        skipping the first offset characters of each key.
+    '''
+    section = _AttributeDict()
+    for key, value in items:
+        *parents, name = key[offset:].split('.')
+        node = section
+        for parent in parents:
+            node = node.setdefault(parent, _AttributeDict())
+        node[name] = value
+    return section
+
+
+def sqlite_import(file_path, db_path, **kwargs):
+    ''' Bulk import a config file into a database for the SQLiteAdapter,
+        returning the number of options written.
+
+        Arguments:
+            file_path   a file of a format in file_adapter_map.
+            db_path     the database, created if needed.
+            kwargs      passed to the file's adapter.
+    '''
+    import json, sqlite3
+    _, ext = os.path.splitext(file_path)
+    AdapterClass = file_adapter_map.get(ext.casefold())
+    if AdapterClass is None or AdapterClass is SQLiteAdapter:
+        raise ValueError(f'unknown format for {file_path!r}')
+
+    adapter = AdapterClass(file_path, **kwargs)
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:  # one transaction
+            conn.execute(SQLiteAdapter._create_sql)
+            cursor = conn.executemany(SQLiteAdapter._insert_sql, (
+                (key, json.dumps(value))
+                for key, value in adapter._iter_items()
+            ))
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+class _LazySections:
+    ''' The top-level sections of a document, each parsed on first use.
+
+        Arguments:
+            text        of the document, dropped once all are parsed.
+            index       a dict of {key: (start, end)} offsets in text.
+            parse       a callable(key, chunk) returning the value.
+    '''
+    __slots__ = ('_index', '_parse', '_parsed', '_text')
+
+    def __init__(self, text, index, parse):
+        self._index = index
+        self._parse = parse
+        self._parsed = {}
+        self._text = text
+
+    def get(self, key, default=None):
+        parsed = self._parsed
+        if key in parsed:
+            return parsed[key]
+        span = self._index.get(key)
+        if span is None:
+            return default
+        log.debug('%s parsing %r', self.__class__.__name__, key)
+        value = parsed[key] = self._parse(key, self._text[span[0]:span[1]])
+        if len(parsed) == len(self._index):
+            self._text = None  # not needed anymore
+        return value
+
+    __getattr__ = get
+
+    def chunk(self, key):
+        ''' The text of a section, None if not found or already dropped. '''
+        span = self._index.get(key)
+        if span is None or self._text is None:
+            return None
+        return self._text[span[0]:span[1]]
+
+    def items(self):
+        for key in self._index:
+            yield key, self.get(key)
+
+
+class _LazySnapshot:
+    ''' A snapshot of lazy sections, to compare across reloads, as a
+        mapping of {dotted.key: value} that parses sections only when
+        their values are asked for.  Sections with the same text in both
+        snapshots are known to be unchanged without parsing them.
+
+        Arguments:
+            sections    the _LazySections of a document, replaced on reload.
+            unwrap      a callable(value) of a section returning plain data.
+    '''
+    __slots__ = ('_flat', '_sections', '_unwrap')
+
+    def __init__(self, sections, unwrap):
+        self._flat = {}  # section: {dotted.key: value}, once parsed
+        self._sections = sections
+        self._unwrap = unwrap
+
+    def __iter__(self):
+        for name in self._sections._index:
+            yield from self._section(name)
+
+    def changed(self, other):
+        ''' Return the keys whose values differ in another snapshot. '''
+        changed = set()
+        mine, theirs = self._sections, other._sections
+        for name in mine._index.keys() | theirs._index.keys():
+            chunk = mine.chunk(name)
+            if chunk is not None and chunk == theirs.chunk(name):
+                continue  # the same text
+            old, new = self._section(name), other._section(name)
+            changed.update(
+                key for key in old.keys() | new.keys()
+                if old.get(key, _MISSING) != new.get(key, _MISSING)
+            )
+        return changed
+
+    def get(self, key, default=None):
+        return self._section(key.partition('.')[0]).get(key, default)
+
+    def items(self):
+        for name in self._sections._index:
+            yield from self._section(name).items()
+
+    def keys(self):
+        return set(self)
+
+    def _section(self, name):
+        flat = self._flat.get(name)
+        if flat is None:
+            value = self._sections.get(name)
+            flat = self._flat[name] = (
+                {} if value is None else
+                dict(_flatten({name: self._unwrap(value)}))
+            )
+        return flat
+
+
+class _Secrets:
+    ''' Decrypts Fernet tokens with a local key file, read on first use.
+
+        Plaintexts are cached by name in bytearrays, which are zeroed when
+        they expire, by a timer thread, are replaced, or are cleared.
+        Requires the cryptography package.
+    '''
+    __slots__ = ('_cache', '_fernet', '_key_path', '_lock', '_ttl')
+
+    def __init__(self, key_path, ttl=None):
+        self._cache = {}  # name: (bytearray, deadline, token)
+        self._fernet = None
+        self._key_path = os.path.expanduser(key_path)
+        self._lock = Lock()
+        self._ttl = ttl
+
+    def decrypt(self, name, token, on_expire=None):
+        ''' Return the plaintext of a token as a str, decoded while locked
+            so the bytearray kept can't be zeroed meanwhile.
+            on_expire() is called once that's been zeroed on time,
+            to drop anything made from it.
+        '''
+        if isinstance(token, str):
+            token = token.encode('ascii')
+        now = monotonic()
+        with self._lock:
+            for key, (_, deadline, _) in list(self._cache.items()):
+                if deadline is not None and deadline <= now:  # expired
+                    self._zero(key)
+            entry = self._cache.get(name)
+            if entry:
+                if entry[2] == token:
+                    return entry[0].decode()
+                self._zero(name)  # replaced
+
+            if self._fernet is None:
+                # defer to avoid loading when not needed, optional too
+                from cryptography.fernet import Fernet
+                with open(self._key_path, 'rb') as infile:
+                    self._fernet = Fernet(infile.read().strip())
+            log.debug('%s decrypting %r', self.__class__.__name__, name)
+            try:
+                plain = bytearray(self._fernet.decrypt(token))
+            except Exception as err:  # InvalidToken has no message
+                raise ValueError(f'unable to decrypt {name!r}: '
+                                 f'{err.__class__.__name__}') from None
+            deadline = None if self._ttl is None else now + self._ttl
+            self._cache[name] = (plain, deadline, token)
+            if deadline is not None:  # on time, even if not used again
+                timer = Timer(self._ttl, self._expire,
+                              args=(name, plain, on_expire))
+                timer.daemon = True
+                timer.start()
+            return plain.decode()
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._cache):
+                self._zero(name)
+
+    __del__ = clear
+
+    def _expire(self, name, plain, on_expire):
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry and entry[0] is plain:  # not replaced since
+                self._zero(name)
+        if on_expire:
+            on_expire()
+
+    def _zero(self, name):
+        plain = self._cache.pop(name)[0]
+        plain[:] = bytes(len(plain))  # in place
+
+
+class _timed:
+    ''' Times a phase of loading, recorded only while profiling.
+        Entries are kept in order of start, so outer phases come first.
+    '''
+    __slots__ = ('_index', '_phase', '_report', '_start', '_target')
+
+    def __init__(self, phase, target):
+        self._phase = phase
+        self._target = target
+
+    def __enter__(self):
+        self._report = report = getattr(_profiling, 'report', None)
+        if report is not None:
+            self._index = len(report)
+            report.append(None)  # placeholder
+            self._start = perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self._report is not None:
+            self._report[self._index] = ProfileEntry(self._phase,
+                self._target, perf_counter() - self._start,
+            )
+
+
+def _shared_adapter(path, options, factory):
+    ''' Return the adapter of a file already parsed in this process, if
+        unchanged on disk since, otherwise one made by factory() to share.
+        Options must be hashable, they distinguish adapters of a file.
+    '''
+    key = (os.path.abspath(path), options)
+    try:
+        adapter = _registry.get(key)
+    except TypeError:  # unhashable, e.g. an interpolation object
+        return factory()
+    if adapter is not None and adapter._stat == _stat_signature(path):
+        log.debug('sharing %r', adapter)
+        return adapter
+    adapter = _registry[key] = factory()
+    return adapter
+
+
+def _index_json(text):
+    ''' Find the offsets of values in a JSON object, without parsing them.
+        Returns a dict of {key: (start, end)}, or None when not an object.
+    '''
+    import re
+    from json.decoder import JSONDecoder, scanstring
+    space = re.compile(r'\s*').match
+    tokens = re.compile(r'"(?:[^"\\]|\\.)*"|[][{}]').finditer
+
+    index = {}
+    pos = space(text).end()
+    if text[pos:pos + 1] != '{':
+        return None
+    pos = space(text, pos + 1).end()
+    if text[pos:pos + 1] == '}':
+        return index
+    try:
+        while True:
+            if text[pos] != '"':
+                return None
+            key, pos = scanstring(text, pos + 1)
+            pos = space(text, pos).end()
+            if text[pos] != ':':
+                return None
+            start = pos = space(text, pos + 1).end()
+            if text[pos] in '{[':  # skip the container
+                depth = 0
+                for match in tokens(text, pos):
+                    token = match.group()
+                    if token in '{[':
+                        depth += 1
+                    elif token in '}]':
+                        depth -= 1
+                        if not depth:
+                            pos = match.end()
+                            break
+                else:
+                    return None
+            else:  # a scalar, small
+                _, pos = JSONDecoder().raw_decode(text, pos)
+            index[key] = (start, pos)  # later duplicates win, as in json
+
+            pos = space(text, pos).end()
+            if text[pos] == '}':
+                return index
+            if text[pos] != ',':
+                return None
+            pos = space(text, pos + 1).end()
+    except (IndexError, ValueError):  # malformed, let the parser say why
+        return None
+
+
+def _index_yaml(text):
+    ''' Find the offsets of top-level sections in a block style YAML
+        document, from each unindented key to the next.
+        Returns a dict of {key: (start, end)}, or None if not as simple.
+    '''
+    import re
+    keys = re.compile(r'''^(?:"([^"\n]*)"|'([^'\n]*)'|([^\s#'"-][^:\n]*?))'''
+                      r'\s*:(?:[ \t]|$)', re.M)
+    content = re.compile(r'^[^\s#]', re.M)  # unindented, not a comment
+
+    index = {}
+    matches = list(keys.finditer(text))
+    if len(matches) != len(content.findall(text)):  # other things, e.g. ---
+        return None
+    for match, following in zip(matches, matches[1:] + [None]):
+        key = next(group for group in match.groups() if group is not None)
+        end = following.start() if following else len(text)
+        index[key] = (match.start(), end)
+    return index
+
+
+def _stat_signature(path):
+    ''' Return a tuple that changes when a file does, or None if missing. '''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _attribute_dicts(value):
+    ''' Restore the attribute interface of sections, e.g. from the daemon. '''
+    if isinstance(value, dict):
+        return _AttributeDict(
+            (key, _attribute_dicts(val)) for key, val in value.items()
+        )
+    return value
+
+
+def _flatten(data, prefix=''):
+    ''' Walk nested dictionaries, yielding (dotted.key, value) leaf pairs. '''
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, prefix + key + '.')
+        else:
+            yield prefix + key, value
+
 
 file_adapter_map = {
+    '.enc': SecretsAdapter,
     '.ini': ConfigParserAdapter,
     '.json': JSONAdapter,
+    '.sqlite': SQLiteAdapter,
+    '.sqlite3': SQLiteAdapter,
     '.xml': XMLAdapter,
     '.yml': SYAMLAdapter,
     '.yaml': SYAMLAdapter,
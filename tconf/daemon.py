@@ -0,0 +1,281 @@
+'''
+    | tconf - TurtleConfig local daemon
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Serves the resolved values of one config to local processes, over a
+    Unix domain socket, see: python3 -m tconf serve --help
+
+    Messages are tuples of literals, written with repr() and read back
+    with ast.literal_eval(), as neither end can run code of the other's.
+    Each is UTF-8 text framed by its length in four big-endian bytes:
+
+        ('get', key)            → ('value', key, value) | ('missing', key)
+                                  | ('error', key, message)
+        ('watch',)              → ('watching',), then pushes of:
+                                  ('invalidate', [key, …])
+'''
+import logging
+import os
+import socket
+import stat
+import struct
+from ast import literal_eval
+from collections.abc import Mapping
+from math import isfinite
+from socketserver import BaseRequestHandler, ThreadingMixIn, UnixStreamServer
+from threading import Event, Lock, Thread
+
+from . import _SectionProxy
+from .adapters import _Adapter
+
+
+log = logging.getLogger(__name__)
+_MAX_FRAME = 64 * 1024 * 1024
+_PUSH_TIMEOUT = 1  # seconds, a watcher slower to read is dropped
+
+
+_LITERAL_TYPES = (bool, bytes, int, str, type(None))
+
+
+def _check_owner(sock, socket_path):
+    ''' Refuse a daemon not run by the current user, as another may have
+        made the socket first.
+    '''
+    uid = os.getuid()
+    if hasattr(socket, 'SO_PEERCRED'):  # Linux, of the process itself
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                struct.calcsize('3i'))
+        _, owner, _ = struct.unpack('3i', creds)
+    else:
+        owner = os.stat(socket_path).st_uid
+    if owner != uid:
+        raise PermissionError(f'{socket_path!r} is owned by uid {owner}, '
+                              f'not {uid}.')
+
+
+def _plain(value):
+    ''' Convert subclasses, e.g. _AttributeDict, to plain literals,
+        raising TypeError for anything else.
+    '''
+    if isinstance(value, Mapping):  # frozen too
+        return { _plain(key): _plain(val) for key, val in value.items() }
+    if isinstance(value, list):
+        return [ _plain(val) for val in value ]
+    if isinstance(value, tuple):  # named too
+        return tuple(_plain(val) for val in value)
+    if isinstance(value, (set, frozenset)):  # frozenset() isn't a literal
+        return { _plain(val) for val in value }
+    if isinstance(value, float):
+        if not isfinite(value):  # inf and nan aren't either
+            raise TypeError(f'{value!r} is not a literal')
+        return float(value)
+    if type(value) in _LITERAL_TYPES:
+        return value
+    if isinstance(value, int):  # subclasses, e.g. enums
+        return int(value)
+    if isinstance(value, str):
+        return str.__str__(value)
+    if isinstance(value, bytes):
+        return bytes(value)
+    raise TypeError(f'{type(value).__name__} is not a literal')
+
+
+def _recv(sock):
+    ''' Read a message, None if the other end has closed. '''
+    header = _recv_exactly(sock, 4)
+    if header is None:
+        return None
+    size = int.from_bytes(header, 'big')
+    if size > _MAX_FRAME:
+        raise ValueError(f'frame of {size} bytes is too large')
+    data = _recv_exactly(sock, size)
+    if data is None:
+        return None
+    try:
+        message = literal_eval(data.decode('utf8'))
+    except (SyntaxError, ValueError, MemoryError, RecursionError) as err:
+        raise ValueError(f'malformed message: {err}') from None
+    if not (isinstance(message, tuple) and message
+            and isinstance(message[0], str)):
+        raise ValueError('malformed message')
+    return message
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _send(sock, message):
+    data = repr(message).encode('utf8')
+    sock.sendall(len(data).to_bytes(4, 'big') + data)
+
+
+def _set_send_timeout(sock, seconds):
+    ''' Bound blocking sends only, settimeout() would end waiting reads. '''
+    whole = int(seconds)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO,
+                    struct.pack('ll', whole, int((seconds - whole) * 1e6)))
+
+
+class _Handler(BaseRequestHandler):
+    ''' One per client connection, answers requests until it closes. '''
+
+    def handle(self):
+        server = self.server
+        sock = self.request
+        with server.lock:
+            server.clients.add(sock)
+        try:
+            while True:
+                message = _recv(sock)
+                if message is None:
+                    break
+                if message[0] == 'get':
+                    _send(sock, server.lookup(message[1]))
+                elif message[0] == 'watch':
+                    _set_send_timeout(sock, _PUSH_TIMEOUT)  # not to stall
+                    with server.lock:  # before any push
+                        _send(sock, ('watching',))
+                        server.watchers.add(sock)
+                else:
+                    log.warning('unknown request: %r', message[0])
+                    break
+        except (OSError, ValueError, EOFError) as err:
+            log.debug('client dropped: %s', err)
+        finally:
+            with server.lock:
+                server.clients.discard(sock)
+                server.watchers.discard(sock)
+
+
+class TurtleServer(ThreadingMixIn, UnixStreamServer):
+    ''' Owns a TurtleConfig and serves its values over a Unix socket.
+
+        Sources are reloaded every interval seconds, and watching clients
+        are pushed the keys that changed, with those referring to them.
+        The socket is readable by its owner only.
+
+        Arguments:
+            cfg             the TurtleConfig to serve.
+            socket_path     where to listen, a stale socket is replaced.
+                            Best in a directory only the user may write,
+                            e.g. $XDG_RUNTIME_DIR.
+            interval        seconds between refreshes, None to skip.
+    '''
+    daemon_threads = True
+
+    def __init__(self, cfg, socket_path, interval=1):
+        self.cfg = cfg
+        self.clients = set()  # connections
+        self.lock = Lock()  # guards the sets, and joining the watchers
+        self.watchers = set()  # connections to push to
+        _remove_stale(socket_path)
+        umask = os.umask(0o177)  # no window where others may connect
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        self.interval = interval
+
+    def lookup(self, key):
+        ''' Resolve a key to a reply message. '''
+        try:
+            value = self.cfg[key]
+        except KeyError:
+            return ('missing', key)
+        except Exception as err:  # e.g. failed type check, client's too
+            return ('error', key, f'{type(err).__name__}: {err}')
+        if value is None or isinstance(value, (_Adapter, _SectionProxy)):
+            return ('missing', key)  # sections are found piecemeal
+        try:
+            value = _plain(value)
+        except TypeError as err:
+            return ('error', key, f'{key!r} can not be served: {err}')
+        return ('value', key, value)
+
+    def push(self, keys):
+        ''' Tell watching clients that keys have changed, dropping those
+            that don't read in time.
+        '''
+        log.debug('invalidating %r', keys)
+        message = ('invalidate', sorted(keys))
+        with self.lock:
+            watchers = list(self.watchers)
+        for sock in watchers:  # not locked, others may come and go
+            try:
+                _send(sock, message)
+            except OSError as err:  # timeouts too
+                log.debug('watcher dropped: %s', err)
+                with self.lock:
+                    self.watchers.discard(sock)
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)  # ends its handler
+                except OSError:
+                    pass
+
+    def serve_turtle(self):
+        ''' Reload sources in the background and serve until shutdown. '''
+        stop = Event()
+        if self.interval:
+            Thread(target=self._reload_loop, args=(stop,), daemon=True,
+                   name='TurtleServerReload').start()
+        try:
+            self.serve_forever()
+        finally:
+            stop.set()
+
+    def _reload_loop(self, stop):
+        ''' Not a subscriber, to push keys whose values no longer resolve,
+            as well as those that do.
+        '''
+        cfg = self.cfg
+        while not stop.wait(self.interval):
+            try:
+                changed = cfg.reload_turtle_sources()
+            except Exception as err:  # keep going, data stays as it was
+                log.warning('reload failed: %s', err)
+                continue
+            if changed:
+                self.push(cfg._with_dependents(changed))
+
+    def server_close(self):
+        ''' Close the socket and connections to it. '''
+        super().server_close()
+        with self.lock:
+            for sock in self.clients:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale(socket_path):
+    ''' Remove a socket left behind, refusing if it's still in use,
+        or anything else found there.
+    '''
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f'{socket_path!r} exists and is not a socket.')
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+    else:
+        raise OSError(f'{socket_path!r} is in use by another daemon.')
+    finally:
+        probe.close()
@@ -0,0 +1,65 @@
+'''
+    tconf - TurtleConfig benchmarks
+
+    Memory retained by a config vs. its number of keys, normal and compact.
+'''
+import gc
+import json
+import os
+import resource
+import tempfile
+import tracemalloc
+
+from tconf import TurtleConfig
+
+
+class AppDefaults:
+
+    class entries:
+
+        class entry:
+            _wildcard = True
+            value: int = 0
+            label: str = ''
+
+
+def write_files(tmpdir, count):
+    data = { f'k{i:05}': {'value': i, 'label': f'item number {i}'}
+             for i in range(count // 2) }
+
+    json_path = os.path.join(tmpdir, f'bench{count}.json')
+    with open(json_path, 'w') as outfile:
+        json.dump({'entries': data}, outfile)
+
+    ini_path = os.path.join(tmpdir, f'bench{count}.ini')
+    with open(ini_path, 'w') as outfile:
+        outfile.write('[entries]\n')
+        for key, item in data.items():
+            outfile.write(f'{key}.value = {item["value"]}\n')
+            outfile.write(f'{key}.label = {item["label"]}\n')
+
+    return json_path, ini_path
+
+
+def measure(path, compact):
+    tracemalloc.start()
+    cfg = TurtleConfig('BenchApp', sources=(path, AppDefaults), compact=compact)
+    gc.collect()  # parsers may hold cycles
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cfg
+    return current, peak
+
+
+with tempfile.TemporaryDirectory() as tmpdir:
+    print(f'{"keys":>8} {"format":>6} {"mode":>8} {"retained":>12} {"peak":>12}')
+    for count in (1_000, 10_000, 100_000):
+        for path in write_files(tmpdir, count):
+            for compact in (False, True):
+                current, peak = measure(path, compact)
+                print(f'{count:8,} {path[-4:]:>6} '
+                      f'{"compact" if compact else "normal":>8} '
+                      f'{current:12,} {peak:12,}')
+
+# resident size, high water mark; KiB on Linux
+print('max rss:', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -45,5 +45,7 @@ class sequences:
 
     sequence_of_stuff: _Sequence[_Union[str, int]] = ('one', 2, 'three')
 
+    list_of_ints: _List[int] = [1, 2, 3]
+
     # Kaboom!
     #~ sequence_of_stuff: _Sequence[_Union[str, int]] = ('one', 2, None)
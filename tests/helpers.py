@@ -0,0 +1,36 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Shared by the tests that write config files and wait on changes.
+'''
+import json, os, tempfile
+from itertools import count
+from time import monotonic, sleep
+
+
+tmpdir = tempfile.TemporaryDirectory()
+_stamps = count(1000)
+
+
+def temp_path(name):
+    ''' A path in a directory removed at exit. '''
+    return os.path.join(tmpdir.name, name)
+
+
+def write_json(path, data):
+    ''' Write data, with a new mtime however fast, so it's seen to change. '''
+    with open(path, 'w') as outfile:
+        json.dump(data, outfile)
+    stamp = next(_stamps)
+    os.utime(path, (stamp, stamp))
+
+
+def wait_for(test, timeout=3):
+    ''' Poll until test() is true, return False on timeout. '''
+    end = monotonic() + timeout
+    while not test():
+        if monotonic() > end:
+            return False
+        sleep(.01)
+    return True
@@ -137,17 +137,14 @@ assert cfg['main.jpeg_quality'] == 95
 print(line)
 
 
-# not able to work hierarchically unless full path given during access
+# sections are proxies, that find the full path during access
 os.environ['PY_APPYMCAPP.MAIN.JPEG_QUALITY'] = '94'
-del cfg._values_cache['main.jpeg_quality']  # clear cache: important!
+del cfg._values_cache['main.jpeg_quality']  # clear cache: important!
 
-caught = False
-try:
-    assert cfg.main.jpeg_quality == 94  # doesn't work  :-(
-except AssertionError:
-    caught = True
-assert caught
-assert cfg['main.jpeg_quality'] == 94  # does work  :-)
+assert cfg.main.jpeg_quality == 94  # works now  :-)
+assert cfg['main.jpeg_quality'] == 94
+assert cfg.main is cfg.main  # one per section
+assert cfg.main['jpeg_quality'] == 94
 print(line)
 
 
@@ -224,6 +221,19 @@ print(line)
 assert cfg.an_option == True
 print(line)
 
+# sections are mappings as well, as when read from the file,
+# with options only in the defaults added
+assert dict(cfg['main']) == {'jpeg_quality': 96, 'work_in_place': False,
+                             'sync_dates_to_filesystem': True,
+                             'dict_annotation': 95, 'foo': 'bar'}
+assert dict(cfg.main.items()) == dict(cfg.main)
+assert 'work_in_place' in cfg.main and 'nope' not in cfg.main
+assert len(cfg.main) == 5
+assert list(cfg.sort) == ['specific', 'template']
+assert cfg.sort['specific'] is cfg.sort.specific
+assert not hasattr(cfg.main, '__missing__')
+print(line)
+
 
 # yaml only ----------------------------------------------------------------
 cfg = TurtleConfig(app_name, sources=('./test.yaml', AppDefaults))
@@ -313,6 +323,9 @@ cfg = TurtleConfig(
 )
 
 # from first
+assert cfg.main.jpeg_quality == 94  # env, set above
+del os.environ['PY_APPYMCAPP.MAIN.JPEG_QUALITY']
+cfg.clear_turtle_cache()
 assert cfg.main.jpeg_quality == 96
 print(line)
 
@@ -322,15 +335,40 @@ assert cfg.an_option == False
 print(line)
 
 # from third
-caught = False
-try:
-    assert cfg.sort.specific.name == 'BoatyMcBoatface'
-except AttributeError: # None has no attributes
-    caught = True
-assert caught
+assert cfg.sort.specific.name == 'BoatyMcBoatface'
 print(line)
 
 assert cfg['sort.specific.name'] == 'BoatyMcBoatface'
 print(line)
 #~ assert cfg.a_null == None
 print(line)
+
+
+# compact -----------------------------------------------------------------
+from tconf.adapters import CompactAdapter
+
+for path in ('./test.ini', './test.json', './test.yaml', './test.xml'):
+    cfg = TurtleConfig(app_name, sources=(path, AppDefaults), compact=True)
+    assert isinstance(cfg._sources[0], CompactAdapter)
+    caught = False
+    try:
+        cfg._sources[0].extra = 1
+    except AttributeError:  # slots, no __dict__
+        caught = True
+    assert caught
+
+    assert cfg.main.jpeg_quality == 96
+    assert cfg['main.jpeg_quality'] == 96
+    assert cfg['sort.template'] == 'x y z'
+    caught = False
+    try:
+        assert cfg['does_not_exist'] is None
+    except KeyError: # None has no attributes
+        caught = True
+    assert caught
+    print(line)
+
+assert cfg['sort.specific.name'] == 'BoatyMcBoatface'  # xml
+cfg = TurtleConfig(app_name, sources=('./test.ini', AppDefaults), compact=True)
+assert cfg.jpeg_quality == 96  # look in main by default
+print(line)
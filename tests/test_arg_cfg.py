@@ -57,3 +57,35 @@ print('name:', val, type(val))
 assert val == 'BoatyMcBoatface'
 print()
 
+
+# lazy parser, scans the command-line w/o building the full parser
+parser = TurtleArgumentParser(AppDefaults, lazy=True)
+vals = parser.parse_turtle_args(['--main-jpeg-quality', '80', '--sort-template=z'])
+print('lazy:', vals)
+assert vals == {'main_jpeg_quality': 80, 'sort_template': 'z'}
+vals = parser.parse_turtle_args(['--a-simple-option', '--main-work-in-place'])
+assert vals == {'a_simple_option': True, 'main_work_in_place': True}
+assert not parser._turtle_built  # fast path taken
+
+assert '--main-jpeg-quality' in parser.format_help()  # built on demand
+assert parser._turtle_built
+print()
+
+# coexist with other command-line layers
+parser = TurtleArgumentParser(AppDefaults, lazy=True, known_only=True)
+vals = parser.parse_turtle_args(['--verbose', '--rotate-resample', '2'])
+assert vals == {'rotate_resample': '2'}
+assert not parser._turtle_built
+
+parser = TurtleArgumentParser(AppDefaults, known_only=True)
+vals = parser.parse_turtle_args(['--verbose', '--rotate-resample', '2'])
+assert vals['rotate_resample'] == '2'
+assert vals['main_jpeg_quality'] is None
+
+parser = TurtleArgumentParser(AppDefaults, lazy=True)
+caught = False
+try:  # bad values fall back to argparse for the error message
+    parser.parse_turtle_args(['--main-jpeg-quality', 'high'])
+except SystemExit:
+    caught = True
+assert caught
@@ -0,0 +1,104 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Memory-mapped numeric arrays.
+'''
+import os, sys, tempfile
+from array import array
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig, MappedArray
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def write_npy(path, descr, shape, data):
+    header = repr({'descr': descr, 'fortran_order': False, 'shape': shape})
+    header += ' ' * (-(10 + len(header) + 1) % 64) + '\n'  # pad, align 64
+    with open(path, 'wb') as outfile:
+        outfile.write(b'\x93NUMPY\x01\x00')
+        outfile.write(len(header).to_bytes(2, 'little'))
+        outfile.write(header.encode('latin1'))
+        outfile.write(data)
+
+
+def to_list(value):
+    return value.tolist()  # memoryview and numpy alike
+
+
+tmpdir = tempfile.TemporaryDirectory()
+npy_path = os.path.join(tmpdir.name, 'curve.npy')
+raw_path = os.path.join(tmpdir.name, 'table.bin')
+bad_path = os.path.join(tmpdir.name, 'bad.npy')
+write_npy(npy_path, MappedArray('f4').dtype, (2, 3),
+          array('f', [0, .5, 1, 1.5, 2, 2.5]).tobytes())
+with open(raw_path, 'wb') as outfile:
+    outfile.write(array('B', range(16)).tobytes())
+write_npy(bad_path, MappedArray('f8').dtype, (6,), bytes(48))
+
+
+F4 = MappedArray('f4')  # named, as strings within annotations are
+F4_ROWS = MappedArray('f4', (None, 3))  # taken for forward references
+U1 = MappedArray('u1')
+U1_SQUARE = MappedArray('u1', (4, 4))
+
+
+class AppDefaults:
+
+    class tables:
+        curve: F4_ROWS = npy_path
+        quant: U1 = raw_path
+        square: U1_SQUARE = raw_path
+        bad: F4 = bad_path
+
+
+cfg = TurtleConfig('ArraysApp', sources=(AppDefaults,))
+
+curve = cfg['tables.curve']
+print('curve:', curve)
+assert to_list(curve) == [[0, .5, 1], [1.5, 2, 2.5]]
+assert tuple(curve.shape) == (2, 3)
+assert cfg['tables.curve'] is curve  # cached
+caught = False
+try:
+    curve[0, 0] = 9
+except (TypeError, ValueError):  # read-only
+    caught = True
+assert caught
+
+assert to_list(cfg.tables.quant) == list(range(16))   # inferred
+assert to_list(cfg['tables.square'])[3] == [12, 13, 14, 15]
+
+caught = False
+try:
+    cfg['tables.bad']
+except TypeError as err:  # only dtype and shape are checked
+    print('error:', err)
+    caught = True
+assert caught
+
+caught = False
+try:
+    MappedArray('f4', (3, 2))(npy_path)
+except TypeError as err:  # shape
+    print('error:', err)
+    caught = True
+assert caught
+
+caught = False
+try:
+    MappedArray('u1', (5, 5))(raw_path)
+except ValueError as err:  # too small
+    print('error:', err)
+    caught = True
+assert caught
+
+
+print('\narray tests passed.')
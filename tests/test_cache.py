@@ -0,0 +1,77 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Cache policy: LRU eviction and per-source expiration.
+'''
+import os, sys
+from time import sleep
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+from tconf.adapters import EnvAdapter, ObjectAdapter
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        work_in_place = False
+        foo = 'bar'
+
+
+app_name = 'CacheApp'
+
+# no limits, plain dict fast path
+cfg = TurtleConfig(app_name, sources=(AppDefaults,))
+assert type(cfg._values_cache) is dict
+assert cfg.turtle_cache_info() == dict(
+    size=0, maxsize=None, evictions=0, expirations=0
+)
+
+# lru
+cfg = TurtleConfig(app_name, sources=(AppDefaults,), cache_size=2)
+assert cfg['main.jpeg_quality'] == 95
+assert cfg['main.work_in_place'] is False
+assert cfg['main.jpeg_quality'] == 95  # refresh
+assert cfg['main.foo'] == 'bar'  # evicts work_in_place
+assert list(cfg._values_cache) == ['main.jpeg_quality', 'main.foo']
+info = cfg.turtle_cache_info()
+print('info:', info)
+assert info['size'] == 2
+assert info['evictions'] == 1
+
+# ttl, short for the environment, forever for defaults
+os.environ['PY_CACHEAPP.MAIN.JPEG_QUALITY'] = '80'
+cfg = TurtleConfig(app_name, sources=(os.environ, AppDefaults),
+                   cache_ttl={EnvAdapter: .05, ObjectAdapter: None})
+assert cfg['main.jpeg_quality'] == 80
+assert cfg['main.foo'] == 'bar'
+os.environ['PY_CACHEAPP.MAIN.JPEG_QUALITY'] = '70'
+assert cfg['main.jpeg_quality'] == 80  # still cached
+sleep(.1)
+assert cfg['main.jpeg_quality'] == 70
+assert 'main.foo' in cfg._values_cache
+info = cfg.turtle_cache_info()
+print('info:', info)
+assert info['expirations'] == 1
+assert info['evictions'] == 0
+
+# expiry is checked once per read, a deadline passing midway can't fail it
+import tconf
+ticks = iter([0, 5, 20])  # store, then reads
+real_monotonic, tconf.monotonic = tconf.monotonic, lambda: next(ticks)
+cache = tconf._TurtleCache()
+cache.store('k', 1, ttl=10)
+assert cache.get('k') == 1  # at 5
+assert cache.get('k', 'gone') == 'gone'  # at 20
+assert 'k' not in cache and cache.expirations == 1
+tconf.monotonic = real_monotonic
+
+cfg.clear_turtle_cache()
+assert cfg.turtle_cache_info()['size'] == 0
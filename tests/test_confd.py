@@ -0,0 +1,77 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    conf.d style folder sources.
+'''
+import json, os, sys, tempfile
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+from tconf.adapters import DirectoryAdapter
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        work_in_place = False
+        foo = 'bar'
+
+    class rotate:
+        resample = 'BICUBIC'
+
+
+tmpdir = tempfile.TemporaryDirectory()
+confd = os.path.join(tmpdir.name, 'conf.d') + '/'
+
+# created when needed, empty for now
+cfg = TurtleConfig('ConfDApp', sources=(confd, AppDefaults), ensure_paths=True)
+assert os.path.isdir(confd)
+assert isinstance(cfg._sources[0], DirectoryAdapter)
+assert cfg['main.jpeg_quality'] == 95
+
+
+def write(name, text):
+    with open(os.path.join(confd, name), 'w') as outfile:
+        outfile.write(text)
+
+
+write('10-base.json', json.dumps({
+    'an_option': False,
+    'main': {'jpeg_quality': 80, 'foo': 'base'},
+}))
+write('20-local.ini', '[main]\njpeg_quality = 85\n')
+write('README', 'not a fragment')
+
+changed = cfg.reload_turtle_sources()
+print('changed:', changed)
+assert cfg['main.jpeg_quality'] == 85  # later wins
+assert cfg['main.foo'] == 'base'
+assert cfg['an_option'] is False
+assert cfg.main.jpeg_quality == 85
+assert cfg.jpeg_quality == 85  # default section
+assert cfg.turtle_keys('main.') == ['main.foo', 'main.jpeg_quality', 'main.work_in_place']
+
+# only changed fragments are re-parsed
+adapter = cfg._sources[0]
+base = adapter._fragments['10-base.json']
+write('20-local.ini', '[main]\njpeg_quality = 70\nwork_in_place = true\n')
+changed = cfg.reload_turtle_sources()
+print('changed:', changed)
+assert changed == {'main.jpeg_quality', 'main.work_in_place'}
+assert adapter._fragments['10-base.json'] is base
+assert cfg['main.jpeg_quality'] == 70
+assert cfg['main.work_in_place'] is True
+
+assert cfg.reload_turtle_sources() == set()  # nothing new
+
+os.remove(os.path.join(confd, '20-local.ini'))
+assert cfg.reload_turtle_sources() == {'main.jpeg_quality', 'main.work_in_place'}
+assert cfg['main.jpeg_quality'] == 80
+tmpdir.cleanup()
@@ -0,0 +1,173 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    A local daemon serving values, with pushed invalidations.
+'''
+import os, sys
+from threading import Thread
+from typing import List
+
+import out  # this script requires the out package
+
+from helpers import temp_path, wait_for, write_json
+
+from tconf import TurtleConfig
+from tconf.adapters import DaemonAdapter
+from tconf.daemon import TurtleServer
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    class main:
+        jpeg_quality: int = 95
+        foo = 'bar'
+        tags: List[str] = ['a']
+
+    class pool:
+        size: int = 4
+
+
+json_path = temp_path('app.json')
+socket_path = temp_path('app.sock')
+write_json(json_path, {'main': {'jpeg_quality': '90'}, 'pool': {'size': 1}})
+
+server_cfg = TurtleConfig('DaemonApp', sources=(json_path, AppDefaults))
+server = TurtleServer(server_cfg, socket_path, interval=.05)
+Thread(target=server.serve_turtle, daemon=True).start()
+assert oct(os.stat(socket_path).st_mode & 0o777) == '0o600'
+
+# values arrive resolved, sections are found piecemeal
+daemon = DaemonAdapter(socket_path)
+cfg = TurtleConfig('DaemonApp', sources=(daemon, AppDefaults))
+assert cfg.main.jpeg_quality == 90  # coerced by the daemon
+assert cfg.main.foo == 'bar'
+assert cfg['main.tags'] == ['a']
+assert cfg.pool.size == 1
+assert cfg.main.nope is None
+print('cached:', daemon._cache)
+assert daemon._cache['main.jpeg_quality'] == 90
+assert daemon._cache['main.nope'] is None  # misses too
+assert 'main.jpeg_quality' not in cfg._values_cache  # kept by the adapter
+
+# changes are pushed, dropping the key and its section
+write_json(json_path, {'main': {'jpeg_quality': 80}, 'pool': {'size': 2}})
+assert wait_for(lambda: 'main.jpeg_quality' not in daemon._cache)
+assert wait_for(lambda: 'pool.size' not in daemon._cache)
+assert cfg.main.jpeg_quality == 80
+assert cfg.pool.size == 2
+assert cfg.main.foo == 'bar'  # unchanged, still cached
+assert 'main.foo' in daemon._cache
+
+# a value failing its type check on the daemon errors here too
+write_json(json_path, {'main': {'jpeg_quality': 'high'}})
+assert wait_for(lambda: 'main.jpeg_quality' not in daemon._cache)
+try:
+    cfg.main.jpeg_quality
+    raise AssertionError('expected ValueError')
+except ValueError as err:
+    print('error:', err)
+
+# a watcher that doesn't read is dropped, in time
+import socket
+from tconf import daemon as daemon_mod
+
+idle = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+idle.connect(socket_path)
+daemon_mod._send(idle, ('watch',))
+assert daemon_mod._recv(idle) == ('watching',)
+assert wait_for(lambda: len(server.watchers) == 2)
+
+def push_until_dropped():
+    for i in range(20):  # until its buffer is full
+        server.push({'key%06d' % n for n in range(i, 100000, 20)})
+        if len(server.watchers) == 1:
+            break
+
+pusher = Thread(target=push_until_dropped, daemon=True)
+pusher.start()
+pusher.join(10)
+assert not pusher.is_alive()  # not stuck
+assert len(server.watchers) == 1
+assert daemon._watcher is not None  # not the reader
+idle.close()
+
+# messages are literals, nothing else is read
+from collections import namedtuple
+
+near, far = socket.socketpair()
+message = ('value', 'k', (1, 2.5, b'x', {'a': {None, True}}))
+daemon_mod._send(near, message)
+assert daemon_mod._recv(far) == message
+for data in (b"__import__('os').getcwd()", b"('ok',) + ('x',)", b'[1]'):
+    far.sendall(len(data).to_bytes(4, 'big') + data)
+    try:
+        daemon_mod._recv(near)
+        raise AssertionError('expected ValueError')
+    except ValueError as err:
+        print('error:', err)
+Point = namedtuple('Point', 'x y')
+assert daemon_mod._plain({'p': Point(1, 2), 's': frozenset([3])}) == \
+    {'p': (1, 2), 's': {3}}
+for value in (object(), float('nan')):
+    try:
+        daemon_mod._plain(value)
+        raise AssertionError('expected TypeError')
+    except TypeError as err:
+        print('error:', err)
+
+# a daemon run by another user is refused
+daemon_mod._check_owner(near, socket_path)  # ours
+real_getuid, daemon_mod.os.getuid = os.getuid, lambda: real_getuid() + 1
+try:
+    daemon_mod._check_owner(near, socket_path)
+    raise AssertionError('expected PermissionError')
+except PermissionError as err:
+    print('error:', err)
+finally:
+    daemon_mod.os.getuid = real_getuid
+near.close()
+far.close()
+
+# a second daemon isn't allowed on the same socket
+try:
+    TurtleServer(server_cfg, socket_path)
+    raise AssertionError('expected OSError')
+except OSError as err:
+    print('error:', err)
+
+# nor is anything else replaced
+try:
+    TurtleServer(server_cfg, json_path)
+    raise AssertionError('expected FileExistsError')
+except FileExistsError as err:
+    print('error:', err)
+assert os.path.isfile(json_path)
+
+# when the daemon goes away, lower sources are found and nothing cached
+server.shutdown()
+server.server_close()
+assert wait_for(lambda: daemon._watcher is None)
+assert daemon._cache == {}
+assert cfg.main.jpeg_quality == 95
+assert cfg.pool.size == 4
+assert daemon._cache == {}
+
+# and it's found again once back, after the retry delay
+write_json(json_path, {'main': {'jpeg_quality': 70}})
+server_cfg.reload_turtle_sources()
+server = TurtleServer(server_cfg, socket_path, interval=.05)
+Thread(target=server.serve_turtle, daemon=True).start()
+daemon._retry_at = 0
+assert cfg.main.jpeg_quality == 95  # from defaults, cached meanwhile
+cfg.clear_turtle_cache()
+assert cfg.main.jpeg_quality == 70
+daemon._close()
+server.shutdown()
+server.server_close()
+assert not os.path.exists(socket_path)
+
+
+print('\ndaemon tests passed.')
@@ -0,0 +1,67 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Frozen values, read-only and safe to share.
+'''
+import copy, sys
+from typing import Dict, List, Set
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    class main:
+        jpeg_quality: int = 95
+        sizes: List[object] = [1, 2, [3, 4]]
+        tags: Set[str] = {'a', 'b'}
+        limits: Dict[str, list] = {'rps': [100, 200]}
+        name = 'bar'
+
+
+def read_only(func):
+    try:
+        func()
+    except (AttributeError, TypeError):
+        return True
+    return False
+
+
+cfg = TurtleConfig('FrozenApp', sources=('./test.json', AppDefaults),
+                   frozen=True)
+sizes = cfg['main.sizes']
+assert sizes == (1, 2, (3, 4))                      # checked as a list first
+assert cfg['main.sizes'] is sizes                   # shared, no copies
+assert cfg['main.tags'] == frozenset({'a', 'b'})
+limits = cfg['main.limits']
+assert limits['rps'] == (100, 200)
+assert read_only(lambda: limits.update(x=1))
+assert read_only(lambda: cfg['main.tags'].add('c'))
+
+# sections too
+from tconf import _freeze
+from tconf.adapters import _AttributeDict
+rotate = _freeze(_AttributeDict(resample='BICUBIC'))
+assert rotate.resample == 'BICUBIC'
+assert read_only(lambda: rotate.__setitem__('resample', 'x'))
+assert read_only(lambda: rotate.pop('resample'))
+assert copy.deepcopy(rotate) == {'resample': 'BICUBIC'}
+assert dict(rotate) == {'resample': 'BICUBIC'}     # a mutable copy
+assert _freeze(rotate) is rotate
+assert cfg['main.jpeg_quality'] == 96
+
+# overlays
+view = cfg.turtle_overlay({'main.sizes': [5]})
+assert view['main.sizes'] == (5,)
+
+# off by default
+cfg = TurtleConfig('FrozenApp', sources=(AppDefaults,))
+assert cfg['main.sizes'] == [1, 2, [3, 4]]
+
+
+print('\nfrozen tests passed.')
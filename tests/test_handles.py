@@ -0,0 +1,63 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Key handles for hot loops, staying current.
+'''
+import sys
+
+import out  # this script requires the out package
+
+from helpers import temp_path, write_json
+
+from tconf import TurtleConfig
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    key = 'an option'
+
+    class main:
+        jpeg_quality: int = 95
+        foo = 'bar'
+
+
+json_path = temp_path('app.json')
+write_json(json_path, {'main': {'jpeg_quality': '90'}})
+
+cfg = TurtleConfig('HandleApp', sources=(json_path, AppDefaults))
+quality = cfg.turtle_key('main.jpeg_quality')
+print('handle:', quality)
+assert quality() == 90  # coerced on the first, slow, lookup
+assert quality.value == 90
+assert 'main.jpeg_quality' in cfg._values_cache
+assert cfg.turtle_key('main.foo')() == 'bar'
+assert cfg.key == 'an option'  # not shadowed
+
+# current across reloads, which swap the cache
+write_json(json_path, {'main': {'jpeg_quality': 85}, 'pad': 'to resize'})
+assert cfg.reload_turtle_sources() == {'main.jpeg_quality', 'pad'}
+assert quality() == 85
+
+# and clearing
+cfg._values_cache['main.jpeg_quality'] = 1  # stale
+assert quality() == 1
+cfg.clear_turtle_cache()
+assert quality() == 85
+
+# overlays apply within their scope
+with cfg.turtle_overlay({'main.jpeg_quality': 50}):
+    assert quality() == 50
+assert quality() == 85
+
+# missing options raise, as with cfg[name]
+try:
+    cfg.turtle_key('main.nope')()
+    raise AssertionError('expected KeyError')
+except KeyError as err:
+    print('error:', err)
+
+
+print('\nhandle tests passed.')
@@ -0,0 +1,101 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    HTTP source, against a local stand-in server.
+'''
+import json, os, sys, tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+from tconf.adapters import HTTPAdapter
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        foo = 'bar'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    document = {'main': {'jpeg_quality': 90}}
+    version = 1
+    requests = []
+    connections = set()
+
+    def do_GET(self):
+        etag = f'"v{self.version}"'
+        self.requests.append((self.path, self.headers.get('If-None-Match')))
+        self.connections.add(self.client_address)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps(self.document).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+Thread(target=server.serve_forever, daemon=True).start()
+url = 'http://127.0.0.1:%s/config' % server.server_port
+
+tmpdir = tempfile.TemporaryDirectory()
+cache_path = os.path.join(tmpdir.name, 'lkg.json')
+
+# format from Content-Type, url has no extension
+cfg = TurtleConfig('HTTPApp', sources=(
+    HTTPAdapter(url, cache_path=cache_path), AppDefaults
+))
+assert cfg['main.jpeg_quality'] == 90
+assert cfg['main.foo'] == 'bar'
+assert os.path.exists(cache_path)
+
+# unchanged, costs a 304
+assert cfg.reload_turtle_sources() == set()
+assert Handler.requests[-1] == ('/config', '"v1"')
+assert len(Handler.connections) == 1  # reused
+
+# changed
+Handler.document = {'main': {'jpeg_quality': 85}}
+Handler.version = 2
+assert cfg.reload_turtle_sources() == {'main.jpeg_quality'}
+assert cfg['main.jpeg_quality'] == 85
+assert len(Handler.connections) == 1
+print('requests:', Handler.requests)
+
+# url given as a source string
+cfg = TurtleConfig('HTTPApp', sources=(url + '?x=1', AppDefaults))
+assert isinstance(cfg._sources[0], HTTPAdapter)
+assert cfg['main.jpeg_quality'] == 85
+
+# server goes away, fall back to last-known-good
+server.shutdown()
+server.server_close()
+adapter = HTTPAdapter(url, cache_path=cache_path, format='.json', timeout=1)
+assert adapter._reload() is False
+cfg = TurtleConfig('HTTPApp', sources=(adapter, AppDefaults))
+assert cfg['main.jpeg_quality'] == 85
+
+cfg = TurtleConfig('HTTPApp', sources=(HTTPAdapter(url, timeout=1), AppDefaults))
+assert cfg['main.jpeg_quality'] == 95  # nothing, on to defaults
+tmpdir.cleanup()
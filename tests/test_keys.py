@@ -0,0 +1,62 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Key enumeration, prefixes, and wildcard schema entries.
+'''
+import os, sys
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        work_in_place = False
+
+    class tenants:
+
+        class tenant:  # stands in for any tenant id
+            _wildcard = True
+
+            class limits:
+                rps: int = 100
+                burst: float = 1.5
+
+
+os.environ['PY_KEYAPP.TENANTS.ACME.LIMITS.RPS'] = '250'
+os.environ['PY_KEYAPP.TENANTS.ACME.LIMITS.BURST'] = '2.5'
+os.environ['PY_KEYAPP.TENANTS.INITECH.LIMITS.RPS'] = '50'
+
+cfg = TurtleConfig('KeyApp', sources=(os.environ, './test.json', AppDefaults))
+
+keys = cfg.turtle_keys()
+print('keys:', keys)
+assert keys == sorted(keys)
+assert 'main.jpeg_quality' in keys
+assert 'rotate.resample' in keys  # from json only
+assert not any('*' in key for key in keys)
+
+assert cfg.turtle_keys('main.') == [
+    'main.jpeg_quality', 'main.sync_dates_to_filesystem', 'main.work_in_place'
+]
+assert cfg.turtle_keys('tenants.acme.') == [
+    'tenants.acme.limits.burst', 'tenants.acme.limits.rps'
+]
+assert cfg.turtle_keys('nope.') == []
+
+# values converted via the wildcard schema entry
+values = dict(cfg.iter_turtle_prefix('tenants.'))
+print('values:', values)
+assert values == {
+    'tenants.acme.limits.burst': 2.5,
+    'tenants.acme.limits.rps': 250,
+    'tenants.initech.limits.rps': 50,
+}
+assert cfg._wildcard_memo['tenants.acme.limits.rps'] is int  # memoized
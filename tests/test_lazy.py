@@ -0,0 +1,81 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Lazy parsing of JSON and YAML sections.
+'''
+import sys
+
+import out  # this script requires the out package
+
+from helpers import temp_path, write_json
+
+from tconf import TurtleConfig
+from tconf.adapters import _LazySections
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = False
+    a_null = None
+
+    class main:
+        jpeg_quality: int = 95
+        sync_dates_to_filesystem = False
+        work_in_place = True
+
+    class rotate:
+        resample = 'NEAREST'
+
+    class sort:
+        template = 'a b c'
+
+
+for path in ('./test.json', './test.yaml'):
+    eager = TurtleConfig('LazyApp', sources=(path, AppDefaults))
+    cfg = TurtleConfig('LazyApp', sources=(path, AppDefaults), lazy=True)
+    sections = cfg._sources[0]._data
+    assert isinstance(sections, _LazySections)
+    assert not sections._parsed                     # nothing yet
+
+    assert cfg['main.jpeg_quality'] == 96
+    assert cfg.main.work_in_place is False
+    assert list(sections._parsed) == ['main']       # only what was touched
+    assert cfg['an_option'] is True
+    assert sorted(sections._parsed) == ['an_option', 'main']
+
+    # the same as eager, once all are read
+    assert cfg.turtle_keys() == eager.turtle_keys()
+    for key in eager.turtle_keys():
+        assert cfg[key] == eager[key], key
+    assert sections._text is None                   # all parsed, dropped
+
+# reloads compare the text of sections, parsing only those that changed
+json_path = temp_path('lazy.json')
+write_json(json_path, {'main': {'jpeg_quality': 90}, 'rotate': {'resample':
+           'BICUBIC'}, 'sort': {'template': 'x'}})
+cfg = TurtleConfig('LazyApp', sources=(json_path, AppDefaults), lazy=True)
+assert cfg.main.jpeg_quality == 90
+cfg.subscribe_turtle('*', lambda key, value: None)  # notified from snapshots
+assert cfg.reload_turtle_sources() == set()
+write_json(json_path, {'main': {'jpeg_quality': 90}, 'rotate': {'resample':
+           'NEAREST'}, 'sort': {'template': 'x'}})
+assert cfg.reload_turtle_sources() == {'rotate.resample'}
+sections = cfg._sources[0]._data
+assert sorted(sections._parsed) == ['rotate']       # not main, nor sort
+assert cfg['rotate.resample'] == 'NEAREST'
+assert cfg.main.jpeg_quality == 90
+
+# merged and compact parse everything, so are refused
+for option in ('merged', 'compact'):
+    try:
+        TurtleConfig('LazyApp', sources=(json_path, AppDefaults), lazy=True,
+                     **{option: True})
+        raise AssertionError('expected ValueError')
+    except ValueError as err:
+        print('error:', err)
+
+
+print('\nlazy tests passed.')
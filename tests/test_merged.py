@@ -0,0 +1,81 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Pre-merged cascade, precedence resolved at load.
+'''
+import os, sys
+
+import out  # this script requires the out package
+
+from helpers import temp_path, write_json
+
+from tconf import TurtleConfig
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        work_in_place = False
+        foo = 'bar'
+
+    class other:
+        level: int = 1
+
+
+class MoreDefaults:
+
+    class other:
+        level: int = 3
+
+
+app_name = 'MergedApp'
+json_path = temp_path('merged.json')
+write_json(json_path, {'main': {'jpeg_quality': 90, 'foo': 'baz'}})
+
+for compact in (False, True):
+    cfg = TurtleConfig(app_name, sources=(os.environ, json_path, AppDefaults),
+                       compact=compact, merged=True)
+    assert cfg._merged['main.jpeg_quality'][0] == 90  # first one wins
+    assert cfg['main.jpeg_quality'] == 90
+    assert cfg['main.foo'] == 'baz'
+    assert cfg['main.work_in_place'] is False
+    assert cfg['other.level'] == 1
+    assert cfg.an_option is True                    # top-level, long way
+    assert cfg.main.foo == 'baz'                    # sections too
+    try:
+        cfg['main.nope']
+        raise AssertionError('main.nope found?')
+    except KeyError:
+        pass
+
+    # live sources above are still asked
+    os.environ['PY_MERGEDAPP.MAIN.FOO'] = 'env'
+    cfg.clear_turtle_cache()
+    assert cfg['main.foo'] == 'env'
+    del os.environ['PY_MERGEDAPP.MAIN.FOO']
+    cfg.clear_turtle_cache()
+    assert cfg['main.foo'] == 'baz'
+
+    # reload re-merges only what changed
+    write_json(json_path, {'main': {'jpeg_quality': 85}})
+    changed = cfg.reload_turtle_sources()
+    print('changed:', changed)
+    assert 'main.foo' in changed
+    assert cfg._merged['main.jpeg_quality'][0] == 85
+    assert cfg['main.jpeg_quality'] == 85
+    assert cfg['main.foo'] == 'bar'                 # falls through
+    write_json(json_path, {'main': {'jpeg_quality': 90, 'foo': 'baz'}})
+
+    # added sources are merged too
+    cfg.add_turtle_source(MoreDefaults)
+    cfg.clear_turtle_cache()
+    assert cfg['other.level'] == 1                  # lowest precedence
+
+
+print('\nmerged tests passed.')
@@ -0,0 +1,102 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Overlays, per-request overrides on a shared config.
+'''
+import asyncio, sys
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        foo = 'bar'
+        opts: dict = {'a': 1}
+
+
+cfg = TurtleConfig('OverlayApp', sources=('./test.ini', AppDefaults))
+assert cfg['main.jpeg_quality'] == 96
+
+# a view
+view = cfg.turtle_overlay({'main.jpeg_quality': '80', 'main': {'foo': 'baz'}})
+assert view['main.jpeg_quality'] == 80          # coerced
+assert view.main.jpeg_quality == 80
+assert view.main.foo == 'baz'
+assert view['an_option'] is True                # from the parent
+assert view.main.opts == {'a': 1}
+assert view._parent is cfg
+assert cfg['main.jpeg_quality'] == 96           # untouched
+assert cfg.main.foo == 'bar'
+
+view2 = view.turtle_overlay({'main.opts': {'b': 2}})  # dict-typed, not a section
+assert view2['main.opts'] == {'b': 2}
+assert view2['main.foo'] == 'baz'
+caught = False
+try:
+    view2['main.nope']
+except KeyError:
+    caught = True
+assert caught
+
+caught = False
+try:
+    cfg.turtle_overlay({'main.jpeg_quality': 'x'})     # checked up front
+except ValueError:
+    caught = True
+assert caught
+
+# scoped
+with cfg.turtle_overlay({'main.jpeg_quality': 70}):
+    assert cfg['main.jpeg_quality'] == 70
+    assert cfg.main.jpeg_quality == 70
+    assert cfg['main.foo'] == 'bar'
+assert cfg['main.jpeg_quality'] == 96
+assert cfg.main.jpeg_quality == 96
+
+
+async def handle(quality):
+    with cfg.turtle_overlay({'main.jpeg_quality': quality}):
+        await asyncio.sleep(0.01)
+        return cfg['main.jpeg_quality']
+
+
+async def main():
+    return await asyncio.gather(handle(10), handle(20), handle(30))
+
+assert asyncio.run(main()) == [10, 20, 30]
+assert cfg['main.jpeg_quality'] == 96
+
+# one view, e.g. kept per tenant, entered by several tasks at once
+tenant = cfg.turtle_overlay({'main.jpeg_quality': 40})
+
+
+async def handle_tenant(delay):
+    with tenant:
+        await asyncio.sleep(delay)
+        return cfg['main.jpeg_quality']
+
+
+async def main():
+    return await asyncio.gather(handle_tenant(0.01), handle_tenant(0.02))
+
+assert asyncio.run(main()) == [40, 40]
+assert cfg['main.jpeg_quality'] == 96
+
+with tenant:  # nested, within one thread
+    with cfg.turtle_overlay({'main.foo': 'baz'}):
+        assert cfg['main.foo'] == 'baz'
+        assert cfg['main.jpeg_quality'] == 96  # innermost only
+    assert cfg['main.jpeg_quality'] == 40
+assert cfg['main.jpeg_quality'] == 96
+
+
+print('\noverlay tests passed.')
@@ -0,0 +1,55 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Startup profile report.
+'''
+import os, sys
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+from tconf.adapters import ProfileEntry
+import config as AppDefaults
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+cfg = TurtleConfig('ProfileApp',
+    sources=(os.environ, './test.ini', './test.json', AppDefaults),
+    merged=True, profile=True,
+)
+report = cfg.turtle_profile()
+for entry in report:
+    print(entry)
+assert all(isinstance(entry, ProfileEntry) for entry in report)
+assert all(entry.seconds >= 0 for entry in report)
+
+phases = [ entry.phase for entry in report ]
+assert phases[0] == 'adapt'                     # the environment
+ini_path = os.path.abspath('./test.ini')
+assert [ (entry.phase, entry.target) for entry in report
+         if entry.target == ini_path ] == [
+    ('adapt', ini_path), ('read', ini_path), ('parse', ini_path),
+]  # outer phases first
+assert ('schema', 'config') in [ (e.phase, e.target) for e in report ]
+assert phases[-1] == 'merge'
+assert cfg['main.jpeg_quality'] == 96
+
+# not unless asked, and not picked up by those that follow
+cfg = TurtleConfig('ProfileApp', sources=('./test.ini', AppDefaults))
+assert cfg.turtle_profile() is None
+cfg.reload_turtle_sources()
+assert report[-1].phase == 'merge'
+
+# nor after a config fails to load
+from tconf import DefaultsMissingError, adapters
+try:
+    TurtleConfig('ProfileApp', sources=('./test.ini',), profile=True)
+    raise AssertionError('expected DefaultsMissingError')
+except DefaultsMissingError:
+    pass
+assert adapters._profiling.report is None
+
+
+print('\nprofile tests passed.')
@@ -0,0 +1,121 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Reloading sources, by hand and in the background.
+'''
+import os, sys
+from threading import Event, Thread
+from time import sleep
+
+import out  # this script requires the out package
+
+from helpers import temp_path, write_json
+
+from tconf import TurtleConfig
+from tconf.adapters import EnvAdapter
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        work_in_place = False
+        foo = 'bar'
+
+
+app_name = 'RefreshApp'
+json_path = temp_path('refresh.json')
+write_json(json_path, {'main': {'jpeg_quality': 90, 'foo': 'baz'}})
+
+for compact, cache_size in ((False, None), (True, 100)):
+    cfg = TurtleConfig(app_name, sources=(os.environ, json_path, AppDefaults),
+                       compact=compact, cache_size=cache_size)
+    assert cfg['main.jpeg_quality'] == 90
+    assert cfg['main.foo'] == 'baz'
+    assert cfg['main.work_in_place'] is False
+    assert cfg.reload_turtle_sources() == set()  # nothing yet
+
+    write_json(json_path, {'main': {'jpeg_quality': 85, 'foo': 'baz'}})
+    changed = cfg.reload_turtle_sources()
+    print('changed:', changed)
+    assert changed == {'main.jpeg_quality'}
+    assert 'main.foo' in cfg._values_cache  # kept
+    assert 'main.jpeg_quality' not in cfg._values_cache
+    assert cfg['main.jpeg_quality'] == 85
+    write_json(json_path, {'main': {'jpeg_quality': 90, 'foo': 'baz'}})
+
+
+# background
+os.environ['PY_REFRESHAPP.MAIN.FOO'] = 'one'
+cfg = TurtleConfig(app_name, sources=(os.environ, AppDefaults))
+assert cfg['main.foo'] == 'one'
+
+cfg.start_turtle_refresh({EnvAdapter: .02})
+os.environ['PY_REFRESHAPP.MAIN.FOO'] = 'two'
+for _ in range(100):
+    if cfg['main.foo'] == 'two':
+        break
+    sleep(.02)
+else:
+    raise AssertionError('not refreshed')
+cfg.stop_turtle_refresh()
+assert cfg._refresh_thread is None
+
+
+# reloads while other threads are filling the cache
+names = ['k%s' % i for i in range(3000)]
+main = type('main', (), dict(dict.fromkeys(names, 0),
+                             __annotations__=dict.fromkeys(names, int)))
+StressDefaults = type('StressDefaults', (), {'main': main})
+
+sys.setswitchinterval(1e-6)  # often, to meet mid-copy
+for cache_size in (None, 1000):
+    write_json(json_path, {'main': dict.fromkeys(names, 1)})
+    cfg = TurtleConfig(app_name, sources=(json_path, StressDefaults),
+                       cache_size=cache_size)
+    stop = Event()
+
+    def look_up():
+        while not stop.is_set():
+            for name in names:
+                cfg['main.' + name]
+
+    threads = [Thread(target=look_up) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    try:
+        for generation in range(2, 22):
+            write_json(json_path, {'main': dict.fromkeys(names, generation)})
+            os.utime(json_path, (generation, generation))  # however fast
+            assert cfg.reload_turtle_sources() == \
+                {'main.' + name for name in names}
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert all(cfg['main.' + name] == 21 for name in names)
+sys.setswitchinterval(.005)
+
+# a failed reload is done again next time, with nothing lost
+import tconf
+
+class BrokenCache(tconf._TurtleCache):
+    def without(self, keys):
+        raise RuntimeError('dictionary changed size during iteration')
+
+cfg._values_cache = BrokenCache()
+write_json(json_path, {'main': dict.fromkeys(names, 22)})
+os.utime(json_path, (22, 22))
+try:
+    cfg.reload_turtle_sources()
+    raise AssertionError('expected RuntimeError')
+except RuntimeError:
+    pass
+cfg._values_cache = tconf._TurtleCache()
+assert len(cfg.reload_turtle_sources()) == len(names)
+assert cfg['main.k0'] == 22
@@ -0,0 +1,94 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    References to other options, across sources.
+'''
+import sys
+
+import out  # this script requires the out package
+
+from helpers import temp_path, write_json
+
+from tconf import TurtleConfig
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    class main:
+        base_dir = '/srv'
+        cache_dir = '${main.base_dir}/cache'
+        thumbs_dir = '${main.cache_dir}/thumbs'
+        price = '$$5 at ${main.base_dir}'
+        fee = '$$5'
+        out_dir = '${main.base_dir}/out'
+        jpeg_quality: int = 95
+        quality_ref: int = '${main.jpeg_quality}'
+
+    class loop:
+        a = '${loop.b}'
+        b = '${loop.a}'
+        missing = '${loop.nope}'
+
+
+json_path = temp_path('refs.json')
+write_json(json_path, {'main': {'base_dir': '/data', 'jpeg_quality': 80}})
+
+cfg = TurtleConfig('RefsApp', sources=(json_path, AppDefaults),
+                   references=True)
+assert cfg['main.cache_dir'] == '/data/cache'       # from another source
+assert cfg['main.thumbs_dir'] == '/data/cache/thumbs'
+assert cfg.main.price == '$5 at /data'
+assert cfg.main.fee == '$5'                         # escaped only
+assert cfg['main.quality_ref'] == 80                # then coerced
+assert cfg._dependents['main.base_dir'] == {'main.cache_dir', 'main.price'}
+
+for key in ('loop.a', 'loop.missing'):
+    caught = False
+    try:
+        cfg[key]
+    except ValueError as err:
+        print('error:', err)
+        caught = True
+    assert caught
+
+# only dependents are dropped
+assert 'main.jpeg_quality' in cfg._values_cache
+write_json(json_path, {'main': {'base_dir': '/var', 'jpeg_quality': 80}})
+assert cfg.reload_turtle_sources() == {'main.base_dir'}
+cache = cfg._values_cache
+assert 'main.jpeg_quality' in cache and 'main.quality_ref' in cache
+assert 'main.cache_dir' not in cache and 'main.thumbs_dir' not in cache
+assert cfg['main.thumbs_dir'] == '/var/cache/thumbs'
+
+# overlays, scoped: overrides are seen by referrers but don't stick
+with cfg.turtle_overlay({'main.base_dir': '/tenant'}):
+    assert cfg['main.thumbs_dir'] == '/tenant/cache/thumbs'  # was cached
+    assert cfg['main.cache_dir'] == '/tenant/cache'
+    assert cfg.main.price == '$5 at /tenant'  # not yet resolved
+assert cfg['main.cache_dir'] == '/var/cache'
+assert cfg['main.thumbs_dir'] == '/var/cache/thumbs'
+assert cfg.main.price == '$5 at /var'
+
+# and views
+view = cfg.turtle_overlay({'main.base_dir': '/view'})
+assert view['main.thumbs_dir'] == '/view/cache/thumbs'
+assert view.main.cache_dir == '/view/cache'
+assert view['main.jpeg_quality'] == 80  # the rest as before
+assert cfg['main.thumbs_dir'] == '/var/cache/thumbs'
+assert cfg._values_cache['main.thumbs_dir'] == '/var/cache/thumbs'
+referrers = view._referrers()
+assert referrers >= {'main.cache_dir', 'main.thumbs_dir', 'main.price'}
+assert view._referrers() is referrers               # until more are known
+assert cfg['main.out_dir'] == '/var/out'
+assert 'main.out_dir' in view._referrers()
+assert view.main.out_dir == '/view/out'
+
+# off by default
+cfg = TurtleConfig('RefsApp', sources=(AppDefaults,))
+assert cfg['main.cache_dir'] == '${main.base_dir}/cache'
+
+
+print('\nreference tests passed.')
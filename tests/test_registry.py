@@ -0,0 +1,60 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Sharing of parsed files, across configs in a process.
+'''
+import gc, sys
+
+import out  # this script requires the out package
+
+from helpers import temp_path, write_json
+
+from tconf import TurtleConfig
+from tconf import adapters
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    class main:
+        jpeg_quality: int = 95
+        foo = 'bar'
+
+
+json_path = temp_path('shared.json')
+write_json(json_path, {'main': {'jpeg_quality': 90}})
+
+one = TurtleConfig('RegistryApp', sources=(json_path, AppDefaults))
+two = TurtleConfig('RegistryApp', sources=(json_path, AppDefaults))
+compact = TurtleConfig('RegistryApp', sources=(json_path, AppDefaults),
+                       compact=True)
+assert one._sources[0] is two._sources[0]            # parsed once
+assert compact._sources[0] is not one._sources[0]   # other options
+assert one['main.jpeg_quality'] == two['main.jpeg_quality'] == 90
+
+# reloaded by one, noticed by the other
+write_json(json_path, {'main': {'jpeg_quality': 85}})
+assert one.reload_turtle_sources() == {'main.jpeg_quality'}
+assert one['main.jpeg_quality'] == 85
+assert two['main.jpeg_quality'] == 90               # cached
+assert two.reload_turtle_sources()
+assert two['main.jpeg_quality'] == 85
+assert two.reload_turtle_sources() == set()
+
+# changed on disk, not shared
+write_json(json_path, {'main': {'jpeg_quality': 80, 'foo': 'baz'}})
+three = TurtleConfig('RegistryApp', sources=(json_path, AppDefaults))
+assert three._sources[0] is not one._sources[0]
+assert three['main.jpeg_quality'] == 80
+assert one['main.jpeg_quality'] == 85
+
+# weak, dropped with their configs
+del one, two, three, compact
+gc.collect()
+assert not [ key for key in adapters._registry.keys()
+             if key[0] == json_path ]
+
+
+print('\nregistry tests passed.')
@@ -0,0 +1,105 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Secrets, decrypted on first use.
+'''
+import json, os, sys, tempfile
+from time import sleep
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+from tconf.adapters import SecretsAdapter
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+try:
+    from cryptography.fernet import Fernet
+except ImportError:
+    print('cryptography not installed, skipping.')
+    sys.exit()
+
+
+class AppDefaults:
+
+    class db:
+        host = 'localhost'
+        password = ''
+        port: int = 5432
+
+    class api:
+        token = ''
+
+
+tmpdir = tempfile.TemporaryDirectory()
+key_path = os.path.join(tmpdir.name, 'secret.key')
+key = Fernet.generate_key()
+with open(key_path, 'wb') as outfile:
+    outfile.write(key)
+fernet = Fernet(key)
+
+json_path = os.path.join(tmpdir.name, 'app.json')
+with open(json_path, 'w') as outfile:
+    json.dump({'db': {
+        'password': 'enc:' + fernet.encrypt(b's3cret').decode(),
+        'port': 'enc:' + fernet.encrypt(b'6543').decode(),
+    }}, outfile)
+enc_path = os.path.join(tmpdir.name, 'secrets.json.enc')
+with open(enc_path, 'wb') as outfile:
+    outfile.write(fernet.encrypt(b'{"api": {"token": "t0ken"}}'))
+
+cfg = TurtleConfig('SecretsApp', sources=(enc_path, json_path, AppDefaults),
+                   secrets_key=key_path, secrets_ttl=0.2, merged=True)
+secrets = cfg._secrets
+adapter = cfg._sources[0]
+assert isinstance(adapter, SecretsAdapter)
+assert not secrets._cache and adapter._token is None  # nothing at load
+
+assert cfg['db.password'] == 's3cret'
+assert cfg['db.port'] == 6543                       # coerced as usual
+assert cfg.db.host == 'localhost'
+assert 'db.password' not in cfg._values_cache       # kept elsewhere
+assert 'db.host' in cfg._values_cache
+assert cfg['api.token'] == 't0ken'
+assert 'api.token' not in cfg._values_cache
+
+plain = secrets._cache['db.password'][0]
+assert cfg['db.password'] == 's3cret'
+assert secrets._cache['db.password'][0] is plain    # cached
+assert type(secrets.decrypt('db.password', secrets._cache['db.password'][2])) \
+    is str                                          # a copy, not shared
+file_plain = adapter._secrets._cache[enc_path][0]
+
+sleep(0.3)                                          # expired, on time
+assert plain == bytearray(6)                        # zeroed
+assert not secrets._cache
+assert file_plain == bytearray(len(file_plain))
+assert adapter._adapter is None                     # parsed, dropped
+assert adapter._secrets._cache == {}
+assert cfg['db.port'] == 6543
+assert cfg['db.password'] == 's3cret'               # again
+assert cfg['api.token'] == 't0ken'
+
+file_plain = adapter._secrets._cache[enc_path][0]
+cfg.clear_turtle_cache()
+assert file_plain == bytearray(len(file_plain))
+assert adapter._adapter is None
+assert not secrets._cache
+assert cfg['api.token'] == 't0ken'
+
+# a late timer is caught up with on access
+adapter._expires = 0
+stale = adapter._adapter
+assert cfg['api.token'] == 't0ken'
+assert adapter._adapter is not stale
+
+caught = False
+try:
+    SecretsAdapter(enc_path)
+except ValueError:  # no key
+    caught = True
+assert caught
+
+
+print('\nsecrets tests passed.')
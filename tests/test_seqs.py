@@ -37,3 +37,42 @@ assert type(result) is tuple
 result = cfg['sequences.sequence_of_stuff']
 print('result:', repr(result), type(result))
 assert isinstance(result, Sequence)
+
+
+# from strings in the environment -----------------------------------------
+import os
+import tconf
+
+os.environ['PY_SEQSAPP.SEQUENCES.LIST_OF_INTS'] = '4, 5, 6'            # delimited
+os.environ['PY_SEQSAPP.SEQUENCES.TUPLE_OF_STRINGS'] = '["a", "b", "c"]'  # json
+os.environ['PY_SEQSAPP.SEQUENCES.LIST_OF_STRINGS'] = "['x', 'y']"     # literal
+cfg = TurtleConfig('SeqsApp', sources=(os.environ, AppDefaults))
+
+result = cfg['sequences.list_of_ints']
+print('result:', repr(result), type(result))
+assert result == [4, 5, 6]
+
+result = cfg['sequences.tuple_of_strings']
+print('result:', repr(result), type(result))
+assert result == ('a', 'b', 'c')
+
+result = cfg['sequences.list_of_strings']
+print('result:', repr(result), type(result))
+assert result == ['x', 'y']
+
+# decoded once, mutable results are copies
+from copy import copy, deepcopy
+from typing import List, Tuple
+key = ('4, 5, 6', List[int])
+assert tconf._DECODE_MEMO[key] == ([4, 5, 6], copy)  # flat, shallow
+assert tconf._copier(('a', 'b')) is None  # shared as is
+assert tconf._copier(([1], 2)) is deepcopy
+nested = tconf._decode_compound('[[1, 2], [3]]', List[List[int]])
+nested[0].append('z')
+assert tconf._decode_compound('[[1, 2], [3]]', List[List[int]]) == [[1, 2], [3]]
+holder = tconf._decode_compound('([1], 2)', Tuple[List[int], int])
+holder[0].append('z')
+assert tconf._decode_compound('([1], 2)', Tuple[List[int], int]) == ([1], 2)
+result.append('z')
+cfg.clear_turtle_cache()
+assert cfg['sequences.list_of_strings'] == ['x', 'y']
@@ -0,0 +1,84 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    SQLite source and bulk import.
+'''
+import os, sqlite3, subprocess, sys, tempfile
+
+import out  # this script requires the out package
+
+from tconf import TurtleConfig
+from tconf.adapters import SQLiteAdapter, sqlite_import
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    an_option = True
+
+    class main:
+        jpeg_quality: int = 95
+        sync_dates_to_filesystem = True
+        work_in_place = False
+
+    class sort:
+        template = 'x y z'
+
+        class specific:
+            name = 'BoatyMcBoatface'
+
+
+tmpdir = tempfile.TemporaryDirectory()
+db_path = os.path.join(tmpdir.name, 'test.sqlite')
+
+count = sqlite_import('./test.json', db_path)
+assert count == 6
+sqlite_import('./test.ini', db_path)  # ini strings on top
+
+cfg = TurtleConfig('SQLApp', sources=(db_path, AppDefaults))
+adapter = cfg._sources[0]
+assert isinstance(adapter, SQLiteAdapter)
+
+assert cfg['main.jpeg_quality'] == 96  # from ini, coerced
+assert cfg['an_option'] is True  # from json
+assert cfg['sort.template'] == 'x y z'
+assert cfg['sort.specific.name'] == 'BoatyMcBoatface'  # defaults
+assert adapter.sequences.list_of_strings == "['one', 'two', 'three']"
+assert cfg.main.jpeg_quality == 96  # section
+assert 'main.jpeg_quality' in adapter._cache
+assert 'main.work_in_place' in cfg.turtle_keys('main.')
+
+# read-only, memory-mapped, tiny cache
+adapter = SQLiteAdapter(db_path, cache_size=2, mmap_size=2**20)
+assert adapter.an_option is True
+assert adapter.main.jpeg_quality == '96'
+assert adapter.does_not_exist is None
+assert len(adapter._cache) == 2
+caught = False
+try:
+    adapter._conn.execute(SQLiteAdapter._insert_sql, ('x', '1'))
+except sqlite3.OperationalError:  # read-only
+    caught = True
+assert caught
+
+# another process updates the db
+assert adapter._reload() is False
+cfg.reload_turtle_sources()  # snapshot, live sources can't compare the first time
+conn = sqlite3.connect(db_path)
+with conn:
+    conn.execute(SQLiteAdapter._insert_sql, ('main.jpeg_quality', '"50"'))
+conn.close()
+assert cfg.reload_turtle_sources() == {'main.jpeg_quality'}
+assert cfg['main.jpeg_quality'] == 50
+
+# command-line
+db_path2 = os.path.join(tmpdir.name, 'test2.sqlite3')
+subprocess.run(
+    [sys.executable, '-m', 'tconf', 'sqlite-import', './test.yaml', db_path2],
+    check=True, env=dict(os.environ, PYTHONPATH='..'),
+)
+cfg = TurtleConfig('SQLApp', sources=(db_path2, AppDefaults))
+assert cfg['main.jpeg_quality'] == 96
+tmpdir.cleanup()
@@ -0,0 +1,81 @@
+'''
+    | tconf - TurtleConfig tests
+    | © 2020, Mike Miller - Released under the LGPL, version 3+.
+
+    Subscriptions to changes, after reloading.
+'''
+import sys
+
+import out  # this script requires the out package
+
+from helpers import temp_path, write_json
+
+from tconf import TurtleConfig
+
+out.configure(level='debug' if '-d' in sys.argv else 'info')
+
+
+class AppDefaults:
+
+    class main:
+        jpeg_quality: int = 95
+        foo = 'bar'
+
+    class pool:
+        size: int = 4
+
+
+high_path = temp_path('high.json')
+low_path = temp_path('low.json')
+write_json(high_path, {'main': {'foo': 'high'}})
+write_json(low_path, {'main': {'jpeg_quality': 90, 'foo': 'low'}})
+
+cfg = TurtleConfig('SubscribeApp',
+                   sources=(high_path, low_path, AppDefaults))
+calls = []
+main_cb = lambda key, value: calls.append(('main', key, value))
+cfg.subscribe_turtle('main.*', main_cb)
+cfg.subscribe_turtle('pool.*',
+                     lambda key, value: calls.append(('pool', key, value)))
+assert cfg['main.foo'] == 'high'
+
+# a change in the lower source is shadowed, only jpeg_quality is new
+write_json(low_path, {'main': {'jpeg_quality': 85, 'foo': 'other'}})
+changed = cfg.reload_turtle_sources()
+print('changed:', changed, 'calls:', calls)
+assert changed == {'main.jpeg_quality', 'main.foo'}
+assert calls == [('main', 'main.jpeg_quality', 85)]  # coerced too
+calls.clear()
+
+# removal falls through to the defaults
+write_json(high_path, {})
+cfg.reload_turtle_sources()
+print('calls:', calls)
+assert calls == [('main', 'main.foo', 'other')]
+calls.clear()
+
+# unrelated subscribers aren't called, a failing one doesn't stop others
+cfg.unsubscribe_turtle('main.*', main_cb)
+def broken(key, value):
+    raise RuntimeError('oops')
+cfg.subscribe_turtle('*', broken)
+cfg.subscribe_turtle('*',
+                     lambda key, value: calls.append(('all', key, value)))
+write_json(high_path, {'pool': {'size': 8}})
+cfg.reload_turtle_sources()
+print('calls:', calls)
+assert calls == [('pool', 'pool.size', 8), ('all', 'pool.size', 8)]
+calls.clear()
+
+assert cfg.reload_turtle_sources() == set()  # nothing new
+assert calls == []
+
+# an invalid new value is skipped, others are still notified
+write_json(high_path, {'main': {'jpeg_quality': 'oops'}, 'pool': {'size': 3}})
+assert cfg.reload_turtle_sources() == {'main.jpeg_quality', 'pool.size'}
+print('calls:', calls)
+assert calls == [('pool', 'pool.size', 3), ('all', 'pool.size', 3)]
+calls.clear()
+
+
+print('\nsubscribe tests passed.')